@@ -0,0 +1,66 @@
+"""Measures the cost of building the artwork urls of a 5,000 items playlist, with and without the memoization.
+
+Usage: python benchmarks/bench_artwork_urls.py
+"""
+
+import urllib.parse
+
+from common import best_time, load_module
+
+artwork = load_module("artwork")
+
+BASE_WEB_URL = "http://kodi:8080/image/image%3A%2F%2F"
+ITEMS = 5000
+TRACKS_PER_ALBUM = 12
+
+
+def thumbnail_url(thumbnail):
+    # same transformation as pykodi
+    return f"http://kodi:8080/image/{urllib.parse.quote_plus(thumbnail)}"
+
+
+def build_raw_items(count: int) -> list:
+    """Builds the artwork of the items as returned by kodi, before formatting."""
+    items = []
+    for idx in range(count):
+        album = idx // TRACKS_PER_ALBUM
+        cover = f"image://smb%3a%2f%2fnas%2fmusic%2falbum{album}%2fcover.jpg/"
+        items.append(
+            {
+                "thumbnail": cover,
+                "fanart": f"image://smb%3a%2f%2fnas%2fmusic%2fartist{album // 3}%2ffanart.jpg/",
+                "poster": cover,
+            }
+        )
+    return items
+
+
+def format_items(builder, items):
+    for item in items:
+        builder.thumbnail_url(item["thumbnail"])
+        builder.art_url(item["fanart"])
+        builder.art_url(item["poster"])
+
+
+def main():
+    items = build_raw_items(ITEMS)
+    uncached = artwork.ArtworkUrlBuilder(BASE_WEB_URL, "@", thumbnail_url, maxsize=0)
+    cached = artwork.ArtworkUrlBuilder(BASE_WEB_URL, "@", thumbnail_url)
+
+    def format_cold():
+        cached.cache_clear()
+        format_items(cached, items)
+
+    print(f"{ITEMS} items, {ITEMS // TRACKS_PER_ALBUM + 1} albums")
+    print(f"{'variant':>22} {'time (ms)':>10}")
+    print(
+        f"{'no memoization':>22} {best_time(lambda: format_items(uncached, items)):>10.3f}"
+    )
+    print(f"{'memoized, cold cache':>22} {best_time(format_cold):>10.3f}")
+    print(
+        f"{'memoized, warm cache':>22} {best_time(lambda: format_items(cached, items)):>10.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
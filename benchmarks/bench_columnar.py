@@ -0,0 +1,34 @@
+"""Compares the size and the encode time of the data published as a list of rows and in the columnar encoding.
+
+Usage: python benchmarks/bench_columnar.py
+"""
+
+import gzip
+
+from common import best_time, build_songs, load_module
+
+json_encoder = load_module("json_encoder")
+columnar = load_module("columnar")
+
+
+def main():
+    dumps = json_encoder.json_dumps
+    print(
+        f"{'items':>8} {'format':>9} {'encode (ms)':>12} {'size (bytes)':>13} {'gzip (bytes)':>13}"
+    )
+    for count in (100, 1000, 10000):
+        payload = build_songs(count)
+        variants = {
+            "rows": lambda: dumps(payload),
+            "columnar": lambda: dumps(columnar.encode_columnar(payload)),
+        }
+        for name, encode in variants.items():
+            duration = best_time(encode)
+            content = encode().encode("utf-8")
+            print(
+                f"{count:>8} {name:>9} {duration:>12.3f} {len(content):>13} {len(gzip.compress(content)):>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
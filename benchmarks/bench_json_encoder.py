@@ -0,0 +1,22 @@
+"""Compares the JSON encoders available for the sensor payloads.
+
+Usage: python benchmarks/bench_json_encoder.py
+"""
+
+from common import best_time, build_songs, load_module
+
+json_encoder = load_module("json_encoder")
+
+
+def main():
+    print(f"{'items':>8} {'encoder':>14} {'encode (ms)':>12} {'size (bytes)':>13}")
+    for count in (100, 1000, 10000):
+        payload = build_songs(count)
+        for name, encoder in json_encoder.ENCODERS.items():
+            duration = best_time(lambda: encoder(payload))
+            size = len(encoder(payload).encode("utf-8"))
+            print(f"{count:>8} {name:>14} {duration:>12.3f} {size:>13}")
+
+
+if __name__ == "__main__":
+    main()
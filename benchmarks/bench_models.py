@@ -0,0 +1,52 @@
+"""Compares the memory, the access time and the serialization time of the items stored as dicts and in the slotted classes of models.py.
+
+The sensors convert the slotted items to dicts the first time they are published (column convert), the dicts being serialized several times faster.
+
+Usage: python benchmarks/bench_models.py
+"""
+
+import tracemalloc
+
+from common import best_time, build_songs, load_module
+
+json_encoder = load_module("json_encoder")
+models = load_module("models")
+
+
+def allocated(build) -> int:
+    tracemalloc.start()
+    items = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def main():
+    encoder = json_encoder.get_encoder()
+    print(f"JSON encoder: {json_encoder.default_encoder_name()}")
+    print(
+        f"{'items':>8} {'storage':>8} {'memory (KB)':>12} {'access (ms)':>12} {'encode (ms)':>12} {'convert (ms)':>13}"
+    )
+    for count in (1000, 10000, 50000):
+        songs = build_songs(count)
+        variants = {
+            "dict": lambda: [dict(song) for song in songs],
+            "slotted": lambda: [models.create_item(song, "song") for song in songs],
+        }
+        for name, build in variants.items():
+            items = build()
+            access = best_time(lambda: [item["title"] for item in items])
+            encode = best_time(lambda: encoder(items), number=3)
+            convert = (
+                f"{best_time(lambda: [item.as_dict() for item in items], number=3):.3f}"
+                if name == "slotted"
+                else "-"
+            )
+            print(
+                f"{count:>8} {name:>8} {allocated(build) / 1024:>12.0f} {access:>12.3f} {encode:>12.3f} {convert:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
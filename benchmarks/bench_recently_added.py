@@ -0,0 +1,64 @@
+"""Measures the cost of reading the attributes of the recently added tv sensor, when the card payload is built at every read and when it is built once per data change.
+
+Usage: python benchmarks/bench_recently_added.py
+"""
+
+from common import best_time, load_module
+
+artwork = load_module("artwork")
+cards = load_module("cards")
+json_encoder = load_module("json_encoder")
+
+BASE_WEB_URL = "http://kodi:8080/image/image%3A%2F%2F"
+
+
+def build_episodes(count: int) -> list:
+    """Builds the episodes as returned by VideoLibrary.GetRecentlyAddedEpisodes."""
+    episodes = []
+    for idx in range(count):
+        show = idx // 10
+        episodes.append(
+            {
+                "episodeid": idx,
+                "label": f"Episode {idx}",
+                "title": f"Episode {idx}",
+                "showtitle": f"TV show {show}",
+                "season": idx % 10 // 5 + 1,
+                "episode": idx % 5 + 1,
+                "dateadded": "2023-01-15 20:30:00",
+                "firstaired": "2023-01-10",
+                "playcount": idx % 2,
+                "rating": 7.56,
+                "runtime": 2640,
+                "art": {
+                    "tvshow.fanart": f"image://smb%3a%2f%2fnas%2ftv%2fshow{show}%2ffanart.jpg/",
+                    "tvshow.poster": f"image://smb%3a%2f%2fnas%2ftv%2fshow{show}%2fposter.jpg/",
+                },
+            }
+        )
+    return episodes
+
+
+def main():
+    builder = artwork.ArtworkUrlBuilder(BASE_WEB_URL)
+    print(f"{'items':>8} {'built at every read (ms)':>25} {'cached (ms)':>12}")
+    for count in (25, 100, 1000):
+        episodes = build_episodes(count)
+        cache = {}
+
+        def build():
+            return {
+                "data": json_encoder.json_dumps(cards.tvshow_cards(episodes, builder))
+            }
+
+        def read_cached():
+            attrs = cache.get("attrs")
+            if attrs is None:
+                attrs = cache["attrs"] = build()
+            return attrs
+
+        print(f"{count:>8} {best_time(build):>25.3f} {best_time(read_cached):>12.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Helpers shared by the benchmarks.
+
+The modules of the integration are loaded from their file, so the benchmarks can run without home assistant installed (the package __init__ imports it).
+"""
+
+import importlib.util
+import pathlib
+import sys
+import timeit
+
+PACKAGE_DIR = (
+    pathlib.Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "kodi_media_sensors"
+)
+PACKAGE_NAME = "kodi_media_sensors_bench"
+
+
+def load_module(name: str):
+    """Loads a module of the integration without running the package __init__."""
+    full_name = f"{PACKAGE_NAME}.{name}"
+    if full_name in sys.modules:
+        return sys.modules[full_name]
+    if PACKAGE_NAME not in sys.modules:
+        package_spec = importlib.util.spec_from_loader(PACKAGE_NAME, loader=None)
+        package = importlib.util.module_from_spec(package_spec)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE_NAME] = package
+    spec = importlib.util.spec_from_file_location(full_name, PACKAGE_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[full_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_songs(count: int, tracks_per_album: int = 12) -> list:
+    """Builds formatted playlist items, as published by the playlist sensor."""
+    songs = []
+    for idx in range(count):
+        album = idx // tracks_per_album
+        artist = album // 3
+        songs.append(
+            {
+                "id": idx,
+                "type": "song",
+                "label": f"Song title number {idx}",
+                "title": f"Song title number {idx}",
+                "album": f"Album title {album}",
+                "albumid": album,
+                "artist": [f"Artist name {artist}"],
+                "artistid": [artist],
+                "duration": 180 + idx % 120,
+                "genre": "Rock, Pop",
+                "thumbnail": f"http://kodi:8080/image/image%3A%2F%2Fsmb%253A%252F%252Fnas%252Fmusic%252Fartist{artist}%252Falbum{album}%252Fcover.jpg%2F",
+                "track": idx % tracks_per_album + 1,
+                "year": 1970 + album % 50,
+                "file": f"smb://nas/music/artist{artist}/album{album}/{idx % tracks_per_album + 1:02d} - song {idx}.flac",
+            }
+        )
+    return songs
+
+
+def best_time(statement, number: int = 10, repeat: int = 5) -> float:
+    """Returns the best time (in ms) of one execution of the statement."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1000
@@ -3,12 +3,24 @@ import logging
 
 from homeassistant import config_entries, core
 
+from .artwork_cache import ArtworkCache
 from .const import (
+    ARTWORK_CACHE_DIRECTORY,
     CONF_KODI_INSTANCE,
     CONF_SENSOR_PLAYLIST,
     CONF_SENSOR_RECENTLY_ADDED_MOVIE,
     CONF_SENSOR_RECENTLY_ADDED_TVSHOW,
     CONF_SENSOR_SEARCH,
+    DATA_ARTWORK_CACHE,
+    DATA_PAYLOAD_STORE,
+    DEFAULT_OPTION_ARTWORK_CACHE_SIZE,
+    DEFAULT_OPTION_ARTWORK_PLACEHOLDERS,
+    DEFAULT_OPTION_ARTWORK_PREWARM,
+    DEFAULT_OPTION_ARTWORK_PROXY,
+    DEFAULT_OPTION_PAYLOAD_COLUMNAR,
+    DEFAULT_OPTION_PAYLOAD_HTTP,
+    DEFAULT_OPTION_PAYLOAD_PATCH,
+    DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW,
     DEFAULT_OPTION_SEARCH_ALBUMS_LIMIT,
     DEFAULT_OPTION_SEARCH_ARTISTS_LIMIT,
     DEFAULT_OPTION_SEARCH_CHANNELS_RADIO_LIMIT,
@@ -28,7 +40,15 @@ from .const import (
     DEFAULT_OPTION_SEARCH_SONGS_LIMIT,
     DEFAULT_OPTION_SEARCH_TVSHOWS_LIMIT,
     DOMAIN,
+    OPTION_ARTWORK_CACHE_SIZE,
+    OPTION_ARTWORK_PLACEHOLDERS,
+    OPTION_ARTWORK_PREWARM,
+    OPTION_ARTWORK_PROXY,
     OPTION_HIDE_WATCHED,
+    OPTION_PAYLOAD_COLUMNAR,
+    OPTION_PAYLOAD_HTTP,
+    OPTION_PAYLOAD_PATCH,
+    OPTION_PLAYLIST_COALESCE_WINDOW,
     OPTION_SEARCH_ALBUMS_LIMIT,
     OPTION_SEARCH_ARTISTS_LIMIT,
     OPTION_SEARCH_CHANNELS_RADIO_LIMIT,
@@ -48,6 +68,8 @@ from .const import (
     OPTION_SEARCH_SONGS_LIMIT,
     OPTION_SEARCH_TVSHOWS_LIMIT,
 )
+from .payload_store import PayloadStore
+from .views import KodiMediaSensorsArtworkView, KodiMediaSensorsPayloadView
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["sensor"]
@@ -56,9 +78,28 @@ PLATFORMS = ["sensor"]
 async def async_setup(hass: core.HomeAssistant, config: dict) -> bool:
     """Set up the Kodi Media Sensor component from yaml configuration."""
     hass.data.setdefault(DOMAIN, {})
+    if DATA_PAYLOAD_STORE not in hass.data[DOMAIN]:
+        payload_store = PayloadStore()
+        hass.data[DOMAIN][DATA_PAYLOAD_STORE] = payload_store
+        if hass.http is not None:
+            hass.http.register_view(KodiMediaSensorsPayloadView(payload_store))
     return True
 
 
+def setup_artwork_proxy(hass: core.HomeAssistant) -> None:
+    """Creates the artwork cache and registers its view, the first time a config entry uses the artwork proxy. The view doesn't require authentication, so it isn't registered as long as the proxy is not used, and it serves nothing once no config entry uses it anymore."""
+    if DATA_ARTWORK_CACHE in hass.data[DOMAIN]:
+        return
+    artwork_cache = ArtworkCache(
+        hass,
+        hass.config.path(ARTWORK_CACHE_DIRECTORY),
+        DEFAULT_OPTION_ARTWORK_CACHE_SIZE,
+    )
+    hass.data[DOMAIN][DATA_ARTWORK_CACHE] = artwork_cache
+    if hass.http is not None:
+        hass.http.register_view(KodiMediaSensorsArtworkView(artwork_cache))
+
+
 async def async_setup_entry(hass, config: config_entries.ConfigEntries):
     """Set up platforms from a ConfigEntry."""
 
@@ -133,6 +174,30 @@ async def async_setup_entry(hass, config: config_entries.ConfigEntries):
         OPTION_SEARCH_KEEP_ALIVE_TIMER: config.options.get(
             OPTION_SEARCH_KEEP_ALIVE_TIMER, DEFAULT_OPTION_SEARCH_KEEP_ALIVE_TIMER
         ),
+        OPTION_PLAYLIST_COALESCE_WINDOW: config.options.get(
+            OPTION_PLAYLIST_COALESCE_WINDOW, DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW
+        ),
+        OPTION_PAYLOAD_HTTP: config.options.get(
+            OPTION_PAYLOAD_HTTP, DEFAULT_OPTION_PAYLOAD_HTTP
+        ),
+        OPTION_PAYLOAD_PATCH: config.options.get(
+            OPTION_PAYLOAD_PATCH, DEFAULT_OPTION_PAYLOAD_PATCH
+        ),
+        OPTION_PAYLOAD_COLUMNAR: config.options.get(
+            OPTION_PAYLOAD_COLUMNAR, DEFAULT_OPTION_PAYLOAD_COLUMNAR
+        ),
+        OPTION_ARTWORK_PROXY: config.options.get(
+            OPTION_ARTWORK_PROXY, DEFAULT_OPTION_ARTWORK_PROXY
+        ),
+        OPTION_ARTWORK_CACHE_SIZE: config.options.get(
+            OPTION_ARTWORK_CACHE_SIZE, DEFAULT_OPTION_ARTWORK_CACHE_SIZE
+        ),
+        OPTION_ARTWORK_PREWARM: config.options.get(
+            OPTION_ARTWORK_PREWARM, DEFAULT_OPTION_ARTWORK_PREWARM
+        ),
+        OPTION_ARTWORK_PLACEHOLDERS: config.options.get(
+            OPTION_ARTWORK_PLACEHOLDERS, DEFAULT_OPTION_ARTWORK_PLACEHOLDERS
+        ),
         CONF_KODI_INSTANCE: kodi_config_entry_id,
         CONF_SENSOR_RECENTLY_ADDED_TVSHOW: sensor_recently_added_tvshow,
         CONF_SENSOR_RECENTLY_ADDED_MOVIE: sensor_recently_added_movie,
@@ -140,6 +205,8 @@ async def async_setup_entry(hass, config: config_entries.ConfigEntries):
         CONF_SENSOR_SEARCH: sensor_search,
         "unsub_options_update_listener": unsub_options_update_listener,
     }
+    if config.options.get(OPTION_ARTWORK_PROXY, DEFAULT_OPTION_ARTWORK_PROXY):
+        setup_artwork_proxy(hass)
 
     for component in PLATFORMS:
         hass.async_create_task(
@@ -0,0 +1,31 @@
+"""Intervals of the refreshes of the sensors backed by the kodi libraries."""
+from datetime import timedelta
+from typing import Optional
+
+
+class AdaptiveInterval:
+    """Interval starting short after the library changed, and doubling at every refresh bringing the same content, up to max_interval."""
+
+    def __init__(
+        self,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        initial_interval: Optional[timedelta] = None,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._interval = initial_interval or min_interval
+
+    @property
+    def interval(self) -> timedelta:
+        return self._interval
+
+    def changed(self) -> timedelta:
+        """The library changed, other changes may follow (a scan adds the items one by one)."""
+        self._interval = self.min_interval
+        return self._interval
+
+    def unchanged(self) -> timedelta:
+        """The library stayed the same since the last refresh."""
+        self._interval = min(self._interval * 2, self.max_interval)
+        return self._interval
@@ -0,0 +1,129 @@
+"""Web urls of the artwork (thumbnail, fanart, poster) published by the sensors."""
+
+import functools
+from typing import Callable, Optional
+from urllib import parse
+import weakref
+
+from .const import ARTWORK_SIZE_THUMBNAIL
+
+DEFAULT_URL_CACHE_SIZE = 4096
+
+_builders = weakref.WeakValueDictionary()
+
+
+class ArtworkUrlBuilder:
+    """Builds the web urls of the artwork of one kodi instance.
+
+    The same artwork is shared by many items (the cover of an album by all its tracks, the fanart of a tvshow by all its episodes), so the urls are memoized in a bounded LRU cache.
+    """
+
+    def __init__(
+        self,
+        base_web_url: str,
+        safe: str = "",
+        thumbnail_url: Optional[Callable[[str], str]] = None,
+        maxsize: int = DEFAULT_URL_CACHE_SIZE,
+        artwork_cache=None,
+        artwork_placeholders=None,
+    ) -> None:
+        self._base_web_url = base_web_url
+        self._safe = safe
+        self._thumbnail_url = thumbnail_url
+        self._artwork_cache = artwork_cache
+        self._artwork_placeholders = artwork_placeholders
+        self.kodi_art_url = functools.lru_cache(maxsize=maxsize)(self._kodi_art_url)
+        self.art_url = functools.lru_cache(maxsize=maxsize)(self._art_url)
+        self.kodi_thumbnail_url = functools.lru_cache(maxsize=maxsize)(
+            self._kodi_thumbnail_url
+        )
+        self.thumbnail_url = functools.lru_cache(maxsize=maxsize)(
+            self._build_thumbnail_url
+        )
+
+    def web_url(self, path: str) -> str:
+        """Get the web URL for the provided path.
+
+        This is used for fanart/poster images that are not a http url.  For
+        example the path is local to the kodi installation or a path to
+        an NFS share.
+
+        :param path: The local/nfs/samba/etc. path.
+        :returns: The web url to access the image over http.
+        """
+        if path.lower().startswith("http"):
+            return path
+        # This looks strange, but the path needs to be quoted twice in order
+        # to work.
+        return self._base_web_url + parse.quote(parse.quote(path, safe=self._safe))
+
+    def placeholder(self, art: str) -> Optional[str]:
+        """Returns the placeholder of an artwork given by kodi (see artwork_placeholder.py), None while it is not computed or when the placeholders are not used."""
+        if self._artwork_placeholders is None or not art:
+            return None
+        return self._artwork_placeholders.get(self.kodi_art_url(art))
+
+    def _kodi_art_url(self, art: str) -> str:
+        return self.web_url(parse.unquote(art)[8:].strip("/"))
+
+    def _art_url(self, art: str, size: Optional[str] = None) -> str:
+        """Returns the web url of an artwork given by kodi (image://...). When the artwork proxy is used, the url of the proxy serving the artwork in the given size is returned."""
+        return self._proxy_url(self.kodi_art_url(art), size)
+
+    def _kodi_thumbnail_url(self, thumbnail: str) -> str:
+        return self._thumbnail_url(thumbnail)
+
+    def _build_thumbnail_url(self, thumbnail: str) -> str:
+        return self._proxy_url(
+            self.kodi_thumbnail_url(thumbnail), ARTWORK_SIZE_THUMBNAIL
+        )
+
+    def _proxy_url(self, url: str, size: Optional[str]) -> str:
+        if self._artwork_cache is None or not url:
+            return url
+        return self._artwork_cache.register(url, size)
+
+    def cache_clear(self) -> None:
+        self.kodi_art_url.cache_clear()
+        self.art_url.cache_clear()
+        self.kodi_thumbnail_url.cache_clear()
+        self.thumbnail_url.cache_clear()
+
+
+def add_placeholders(
+    item, url_builder: ArtworkUrlBuilder, fanart: str, poster: str
+) -> None:
+    """Adds the placeholders of the fanart and the poster given by kodi to the item (or card), when they are computed (see artwork_placeholder.py)."""
+    for key, art in (("fanart_placeholder", fanart), ("poster_placeholder", poster)):
+        placeholder = url_builder.placeholder(art)
+        if placeholder:
+            item[key] = placeholder
+
+
+def get_url_builder(
+    base_web_url: str,
+    safe: str = "",
+    thumbnail_url: Optional[Callable[[str], str]] = None,
+    artwork_cache=None,
+    artwork_placeholders=None,
+) -> ArtworkUrlBuilder:
+    """Returns the builder shared by the entities of the same kodi instance. The builder is released when no entity uses it anymore."""
+    key = (
+        base_web_url,
+        safe,
+        # a bound method is created at every access, its kodi object identifies it
+        id(getattr(thumbnail_url, "__self__", thumbnail_url)),
+        id(artwork_cache),
+        id(artwork_placeholders),
+    )
+    builder = _builders.get(key)
+    if builder is None:
+        builder = ArtworkUrlBuilder(
+            base_web_url,
+            safe,
+            thumbnail_url,
+            artwork_cache=artwork_cache,
+            artwork_placeholders=artwork_placeholders,
+        )
+        _builders[key] = builder
+    return builder
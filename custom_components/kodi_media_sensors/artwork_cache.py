@@ -0,0 +1,252 @@
+"""Disk cache of the artwork downloaded from kodi, served by KodiMediaSensorsArtworkView."""
+import asyncio
+from collections import OrderedDict
+import hashlib
+import io
+import logging
+import os
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import ARTWORK_SIZES, ARTWORK_VIEW_URL
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+MEGABYTE = 1024 * 1024
+# kodi urls of the artwork published, the least recently used are forgotten first
+MAX_ARTWORK_URLS = 16384
+
+_pillow_missing_logged = False
+
+# signatures of the image formats served by kodi
+IMAGE_EXTENSIONS = [
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG", ".png"),
+    (b"GIF8", ".gif"),
+    (b"RIFF", ".webp"),
+    (b"BM", ".bmp"),
+]
+
+
+def artwork_key(url: str) -> str:
+    """Returns the key identifying the artwork of a kodi url. The url (holding the kodi credentials) is never published, only its key."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def image_extension(content: bytes) -> str:
+    """Returns the extension of the image, so the view serves it with the right content type."""
+    for signature, extension in IMAGE_EXTENSIONS:
+        if content.startswith(signature):
+            return extension
+    return ".jpg"
+
+
+def resize_image(content: bytes, width: int) -> bytes:
+    """Resizes the image to the given width, keeping its ratio. The image is returned unchanged if Pillow is not installed (it is a requirement of the integration), if it is already smaller or if it can't be read."""
+    if Image is None:
+        global _pillow_missing_logged
+        if not _pillow_missing_logged:
+            _LOGGER.warning(
+                "Pillow is not installed, the artwork is served in its original size"
+            )
+            _pillow_missing_logged = True
+        return content
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if image.width <= width:
+                return content
+            image.thumbnail((width, width * image.height // image.width))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=85, optimize=True)
+            return output.getvalue()
+    except Exception as exception:
+        _LOGGER.debug("Artwork can't be resized: %s", str(exception))
+        return content
+
+
+class ArtworkCache:
+    """Keeps the artwork downloaded from kodi on disk, in its original size and in the sizes used by the cards. Each artwork is downloaded once, the sizes are resized from the original in the cache. The least recently used files are removed when the size of the cache exceeds its limit.
+
+    The cache is shared by the config entries using the artwork proxy, each one registering its maximum size. The largest of them is used.
+    """
+
+    def __init__(self, hass: HomeAssistant, directory: str, max_size: int) -> None:
+        self._hass = hass
+        self._directory = directory
+        self._default_max_size = max_size
+        self._max_sizes: dict[str, int] = {}
+        self._max_bytes = max_size * MEGABYTE
+        self._urls: OrderedDict[str, str] = OrderedDict()
+        # name of the artwork -> (name of the file, size of the file), least recently used first
+        self._files: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._fetching: dict[str, asyncio.Task] = {}
+
+    @property
+    def in_use(self) -> bool:
+        """True while a config entry uses the artwork proxy."""
+        return len(self._max_sizes) > 0
+
+    def set_max_size(self, entry_id: str, max_size: int) -> None:
+        """Registers a config entry using the cache, with its maximum size of the cache in MB."""
+        self._max_sizes[entry_id] = max_size
+        self._update_max_bytes()
+
+    def remove_max_size(self, entry_id: str) -> None:
+        """Unregisters a config entry which doesn't use the cache anymore."""
+        self._max_sizes.pop(entry_id, None)
+        self._update_max_bytes()
+
+    def _update_max_bytes(self) -> None:
+        max_size = max(self._max_sizes.values(), default=self._default_max_size)
+        self._max_bytes = max_size * MEGABYTE
+        if self._loaded and self._total_bytes > self._max_bytes:
+            self._hass.async_create_task(self._async_evict())
+
+    def register(self, url: str, size: Optional[str] = None) -> str:
+        """Registers a kodi artwork url and returns the url of the proxy serving it."""
+        key = artwork_key(url)
+        self._urls[key] = url
+        self._urls.move_to_end(key)
+        if len(self._urls) > MAX_ARTWORK_URLS:
+            self._urls.popitem(last=False)
+        proxy_url = ARTWORK_VIEW_URL.format(key=key)
+        if size in ARTWORK_SIZES:
+            proxy_url += "?size=" + size
+        return proxy_url
+
+    async def async_get(self, key: str, size: Optional[str] = None) -> Optional[str]:
+        """Returns the path of the file holding the artwork, downloading it from kodi if it is not cached yet. Returns None if the artwork is unknown or can't be downloaded."""
+        await self._async_load()
+        if size not in ARTWORK_SIZES:
+            size = None
+        file_name = key if size is None else f"{key}_{size}"
+
+        if file_name in self._files:
+            self._files.move_to_end(file_name)
+            return self._path(self._files[file_name][0])
+
+        task = self._fetching.get(file_name)
+        if task is None:
+            task = self._hass.async_create_task(self._async_fetch(key, size, file_name))
+            self._fetching[file_name] = task
+            task.add_done_callback(lambda _: self._fetching.pop(file_name, None))
+        return await asyncio.shield(task)
+
+    async def _async_fetch(self, key, size, file_name) -> Optional[str]:
+        if size is not None:
+            return await self._async_resize(key, size, file_name)
+
+        url = self._urls.get(key)
+        if url is None:
+            return None
+        self._urls.move_to_end(key)
+
+        session = async_get_clientsession(self._hass)
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    _LOGGER.debug(
+                        "Artwork %s not downloaded, status %s", key, response.status
+                    )
+                    return None
+                content = await response.read()
+        except Exception as exception:
+            _LOGGER.warning("Error downloading artwork from kodi: %s", str(exception))
+            return None
+
+        file = await self._hass.async_add_executor_job(self._write, file_name, content)
+        return await self._async_add_file(file_name, file)
+
+    async def _async_resize(self, key, size, file_name) -> Optional[str]:
+        """Resizes the original artwork, downloaded first if it is not in the cache."""
+        original_path = await self.async_get(key)
+        if original_path is None:
+            return None
+        try:
+            file = await self._hass.async_add_executor_job(
+                self._write_resized, file_name, original_path, ARTWORK_SIZES[size]
+            )
+        except OSError as exception:
+            # the original may have been evicted meanwhile
+            _LOGGER.debug("Artwork %s not resized: %s", key, str(exception))
+            return None
+        return await self._async_add_file(file_name, file)
+
+    async def _async_add_file(self, file_name: str, file: tuple) -> str:
+        self._files[file_name] = file
+        self._total_bytes += file[1]
+        await self._async_evict()
+        return self._path(file[0])
+
+    def _write_resized(self, file_name: str, original_path: str, width: int) -> tuple:
+        with open(original_path, "rb") as file:
+            content = file.read()
+        return self._write(file_name, resize_image(content, width))
+
+    def _write(self, file_name: str, content: bytes) -> tuple:
+        file_name += image_extension(content)
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(file_name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+        return (file_name, len(content))
+
+    async def _async_evict(self) -> None:
+        removed = []
+        while self._total_bytes > self._max_bytes and len(self._files) > 1:
+            _, (file_name, file_size) = self._files.popitem(last=False)
+            self._total_bytes -= file_size
+            removed.append(self._path(file_name))
+        if removed:
+            _LOGGER.debug("%s artwork files removed from the cache", len(removed))
+            await self._hass.async_add_executor_job(self._remove_files, removed)
+
+    @staticmethod
+    def _remove_files(paths: list) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def _async_load(self) -> None:
+        """Loads the files already in the cache, the oldest first."""
+        if self._loaded:
+            return
+        self._loaded = True
+        files = await self._hass.async_add_executor_job(self._scan)
+        for file_name, file_size in files:
+            name = os.path.splitext(file_name)[0]
+            if name not in self._files:
+                self._files[name] = (file_name, file_size)
+                self._files.move_to_end(name, last=False)
+                self._total_bytes += file_size
+        await self._async_evict()
+
+    def _scan(self) -> list:
+        if not os.path.isdir(self._directory):
+            return []
+        files = []
+        for entry in os.scandir(self._directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        # most recent first, as they are moved one by one to the start of the LRU order
+        files.sort(reverse=True)
+        return [(name, size) for _, name, size in files]
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self._directory, file_name)
@@ -0,0 +1,135 @@
+"""Tiny previews of the posters and fanarts, published next to their urls so the cards show them while the artwork loads."""
+
+import asyncio
+import base64
+from collections import OrderedDict, deque
+import io
+import logging
+from typing import Callable, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .artwork_cache import ArtworkCache, artwork_key
+from .const import ARTWORK_SIZE_THUMBNAIL
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# the placeholder fits in this box (in pixels), the cards stretch and blur it
+PLACEHOLDER_SIZE = (16, 24)
+PLACEHOLDER_QUALITY = 40
+# artwork downloaded at the same time to compute the placeholders
+PLACEHOLDER_CONCURRENCY = 2
+# placeholders kept in memory, the least recently used are computed again when needed
+PLACEHOLDER_CACHE_SIZE = 4096
+
+
+def placeholder_data_uri(content: bytes) -> Optional[str]:
+    """Returns the image reduced to PLACEHOLDER_SIZE as a JPEG data uri (a few hundred bytes). Returns None if Pillow is not installed or if the image can't be read."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            # the JPEG images are decoded at a reduced scale, much faster than in full size
+            image.draft("RGB", (PLACEHOLDER_SIZE[0] * 8, PLACEHOLDER_SIZE[1] * 8))
+            image = image.convert("RGB")
+            image.thumbnail(PLACEHOLDER_SIZE)
+            output = io.BytesIO()
+            image.save(
+                output, format="JPEG", quality=PLACEHOLDER_QUALITY, optimize=True
+            )
+    except Exception as exception:
+        _LOGGER.debug("Placeholder can't be computed: %s", str(exception))
+        return None
+    return "data:image/jpeg;base64," + base64.b64encode(output.getvalue()).decode(
+        "ascii"
+    )
+
+
+class ArtworkPlaceholders:
+    """Computes the placeholders of the artwork in the background and keeps them by kodi url, in a bounded LRU cache. With the artwork proxy, the placeholders are computed from the thumbnail of its cache.
+
+    The placeholder of an artwork is None until it is computed. The listeners are called when the placeholders requested meanwhile are ready, so the sensors publish them.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, artwork_cache: Optional[ArtworkCache] = None
+    ) -> None:
+        self._hass = hass
+        self._artwork_cache = artwork_cache
+        self._placeholders: OrderedDict[str, Optional[str]] = OrderedDict()
+        self._pending: deque[str] = deque()
+        self._queued: set[str] = set()
+        self._workers: set[asyncio.Task] = set()
+        self._listeners: list[Callable[[], None]] = []
+
+    def get(self, url: str) -> Optional[str]:
+        """Returns the placeholder of a kodi artwork url, or None if it is not computed yet. The missing placeholder is computed in the background."""
+        if url in self._placeholders:
+            self._placeholders.move_to_end(url)
+            return self._placeholders[url]
+        if Image is not None and url and url not in self._queued:
+            self._queued.add(url)
+            self._pending.append(url)
+            if len(self._workers) < PLACEHOLDER_CONCURRENCY:
+                worker = self._hass.async_create_task(self._async_work())
+                self._workers.add(worker)
+                worker.add_done_callback(self._worker_done)
+        return None
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Registers a callback called when new placeholders are ready. Returns the function removing it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    async def _async_work(self) -> None:
+        while self._pending:
+            url = self._pending.popleft()
+            try:
+                content = await self._async_download(url)
+                if content:
+                    # None is kept too, so an artwork that can't be read isn't downloaded again
+                    self._placeholders[url] = await self._hass.async_add_executor_job(
+                        placeholder_data_uri, content
+                    )
+                    if len(self._placeholders) > PLACEHOLDER_CACHE_SIZE:
+                        self._placeholders.popitem(last=False)
+            except Exception as exception:
+                # the url holds the kodi credentials, only its key is logged
+                _LOGGER.debug(
+                    "Placeholder of %s not computed: %s",
+                    artwork_key(url),
+                    str(exception),
+                )
+            # the artwork not downloaded (kodi off, timeout, ...) is requested again by the next publish
+            self._queued.discard(url)
+
+    def _worker_done(self, worker: asyncio.Task) -> None:
+        self._workers.discard(worker)
+        if not self._workers and not worker.cancelled():
+            for listener in list(self._listeners):
+                listener()
+
+    async def _async_download(self, url: str) -> Optional[bytes]:
+        if self._artwork_cache is not None:
+            path = await self._artwork_cache.async_get(
+                artwork_key(url), ARTWORK_SIZE_THUMBNAIL
+            )
+            if path is None:
+                return None
+            return await self._hass.async_add_executor_job(_read_file, path)
+        session = async_get_clientsession(self._hass)
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.read()
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
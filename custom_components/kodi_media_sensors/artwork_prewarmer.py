@@ -0,0 +1,85 @@
+"""Background requests of the artwork of the new items, so it is ready before a card shows it."""
+import asyncio
+from collections import OrderedDict, deque
+import logging
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .artwork_cache import ArtworkCache, artwork_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# requests sent to kodi at the same time, so the requests of the cards keep the priority
+PREWARM_CONCURRENCY = 2
+# pause before each request, the prewarming only uses the idle time of kodi
+PREWARM_DELAY = 0.2
+# artwork waiting to be requested, the new artwork is dropped above this number
+PREWARM_MAX_PENDING = 200
+# artwork remembered as already requested, the oldest is forgotten first
+PREWARM_MEMORY_SIZE = 4096
+PREWARM_CHUNK_SIZE = 65536
+
+
+class ArtworkPrewarmer:
+    """Requests the artwork the first time a sensor publishes it. Kodi generates the thumbnail of an artwork at its first request, decoding the full size image, so the card showing a newly added item doesn't wait for it. With the artwork proxy, the artwork is downloaded into the cache of the proxy, resized for the cards.
+
+    The requests run in the background, PREWARM_CONCURRENCY at a time, and each artwork is only requested once.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        artwork_cache: Optional[ArtworkCache] = None,
+        concurrency: int = PREWARM_CONCURRENCY,
+    ) -> None:
+        self._hass = hass
+        self._artwork_cache = artwork_cache
+        self._concurrency = concurrency
+        self._pending: deque[tuple[str, Optional[str]]] = deque()
+        self._requested: OrderedDict[tuple[str, Optional[str]], None] = OrderedDict()
+        self._workers: set[asyncio.Task] = set()
+
+    def prewarm(self, url: str, size: Optional[str] = None) -> None:
+        """Queues the request of a kodi artwork url, unless it was already requested. The size is the one requested from the artwork proxy."""
+        if self._artwork_cache is None:
+            # kodi serves the artwork in a single size
+            size = None
+        artwork = (url, size)
+        if not url or artwork in self._requested:
+            return
+        if len(self._pending) >= PREWARM_MAX_PENDING:
+            _LOGGER.debug("Too many artwork waiting to be prewarmed, artwork dropped")
+            return
+        self._requested[artwork] = None
+        if len(self._requested) > PREWARM_MEMORY_SIZE:
+            self._requested.popitem(last=False)
+        self._pending.append(artwork)
+        if len(self._workers) < self._concurrency:
+            # not tracked by home assistant, which doesn't wait for the prewarming at startup
+            worker = self._hass.loop.create_task(self._async_work())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    async def _async_work(self) -> None:
+        while self._pending:
+            url, size = self._pending.popleft()
+            await asyncio.sleep(PREWARM_DELAY)
+            await self._async_request(url, size)
+
+    async def _async_request(self, url: str, size: Optional[str]) -> None:
+        try:
+            if self._artwork_cache is not None:
+                await self._artwork_cache.async_get(artwork_key(url), size)
+                return
+            session = async_get_clientsession(self._hass)
+            async with session.get(url) as response:
+                # the content is not needed, only the thumbnail generated by kodi
+                async for _ in response.content.iter_chunked(PREWARM_CHUNK_SIZE):
+                    pass
+        except Exception as exception:
+            # the url holds the kodi credentials, only its key is logged
+            _LOGGER.debug(
+                "Artwork %s not prewarmed: %s", artwork_key(url), str(exception)
+            )
@@ -0,0 +1,98 @@
+"""Payloads of the upcoming-media-card published by the recently added sensors."""
+
+import logging
+
+from .artwork import ArtworkUrlBuilder, add_placeholders
+from .const import ARTWORK_SIZE_FANART, ARTWORK_SIZE_POSTER
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def tvshow_cards(shows: list, url_builder: ArtworkUrlBuilder) -> list:
+    """Returns the cards of the recently added episodes, preceded by the defaults of the card. The watched episodes are filtered by kodi when they are hidden (see coordinator.py)."""
+    card_json = [
+        {
+            "title_default": "$title",
+            "line1_default": "$episode",
+            "line2_default": "$release",
+            "line3_default": "$rating - $runtime",
+            "line4_default": "$number",
+            "icon": "mdi:eye-off",
+        }
+    ]
+    for show in shows:
+        try:
+            card = {
+                "airdate": show["dateadded"].replace(" ", "T") + "Z",
+                "episode": show["title"],
+                "fanart": "",
+                "flag": show["playcount"] == 0,
+                "genres": "",
+                "number": "S{:0>2}E{:0>2}".format(show["season"], show["episode"]),
+                "poster": "",
+                "release": "$day, $date",
+                "runtime": show["runtime"] // 60,
+                "title": show["showtitle"],
+                "studio": "",
+            }
+            rating = round(show["rating"], 1)
+            if rating:
+                rating = f"\N{BLACK STAR} {rating}"
+            card["rating"] = rating
+            fanart = show["art"].get("tvshow.fanart", "")
+            poster = show["art"].get("tvshow.poster", "")
+            if fanart:
+                card["fanart"] = url_builder.art_url(fanart, ARTWORK_SIZE_FANART)
+            if poster:
+                card["poster"] = url_builder.art_url(poster, ARTWORK_SIZE_POSTER)
+            add_placeholders(card, url_builder, fanart, poster)
+        except KeyError:
+            _LOGGER.warning("Error parsing key from tv blob: %s", show)
+            continue
+        card_json.append(card)
+    return card_json
+
+
+def movie_cards(movies: list, url_builder: ArtworkUrlBuilder) -> list:
+    """Returns the cards of the recently added movies, preceded by the defaults of the card. The watched movies are filtered by kodi when they are hidden (see coordinator.py)."""
+    card_json = [
+        {
+            "title_default": "$title",
+            "line1_default": "$genres",
+            "line2_default": "$release",
+            "line3_default": "$rating - $runtime",
+            "line4_default": "$studio",
+            "icon": "mdi:eye-off",
+        }
+    ]
+    for movie in movies:
+        try:
+            card = {
+                "aired": movie["premiered"],
+                "airdate": movie["dateadded"].replace(" ", "T") + "Z",
+                "flag": movie["playcount"] == 0,
+                "genres": ",".join(movie["genre"]),
+                "rating": round(movie["rating"], 1),
+                "release": "$date",
+                "runtime": movie["runtime"] // 60,
+                "title": movie["title"],
+                "studio": ",".join(movie["studio"]),
+            }
+            rating = round(movie["rating"], 1)
+            if rating:
+                rating = f"\N{BLACK STAR} {rating}"
+            card["rating"] = rating
+            fanart = movie["art"].get("fanart", "")
+            poster = movie["art"].get("poster", "")
+        except KeyError:
+            _LOGGER.warning("Error parsing key from movie blob: %s", movie)
+            continue
+        add_placeholders(card, url_builder, fanart, poster)
+        if fanart:
+            fanart = url_builder.art_url(fanart, ARTWORK_SIZE_FANART)
+        if poster:
+            poster = url_builder.art_url(poster, ARTWORK_SIZE_POSTER)
+        card["fanart"] = fanart
+        card["poster"] = poster
+        card_json.append(card)
+    return card_json
@@ -0,0 +1,50 @@
+"""Columnar encoding of the data published by the sensors.
+
+The rows of the data (songs, episodes, ...) mostly share the same keys. Instead of repeating the keys in every row, the encoded data holds the list of the key sets used (the schemas) and, for each row, the index of its schema followed by its values:
+
+{"schemas": [["id", "title"]], "rows": [[0, 1, "song 1"], [0, 2, "song 2"]]}
+"""
+from typing import Any
+
+from .models import MediaItem
+
+DATA_ENCODING_COLUMNAR = "columnar"
+
+
+def encode_columnar(rows: list) -> dict:
+    """Encodes a list of dicts. The rows which are not dicts are kept as is, with the schema -1."""
+    schemas = []
+    schema_index = {}
+    encoded = []
+    for row in rows:
+        if not isinstance(row, (dict, MediaItem)):
+            encoded.append([-1, row])
+            continue
+        keys = tuple(row)
+        index = schema_index.get(keys)
+        if index is None:
+            index = len(schemas)
+            schema_index[keys] = index
+            schemas.append(list(keys))
+        encoded.append([index, *row.values()])
+    return {"schemas": schemas, "rows": encoded}
+
+
+def decode_columnar(data: dict) -> list:
+    """Decodes the data encoded by encode_columnar."""
+    schemas = data["schemas"]
+    rows = []
+    for row in data["rows"]:
+        index = row[0]
+        if index < 0:
+            rows.append(row[1])
+        else:
+            rows.append(dict(zip(schemas[index], row[1:])))
+    return rows
+
+
+def encode_data(data: Any, encoding: str = None) -> Any:
+    """Encodes the data of a sensor with the given encoding. Data which are not a list are never encoded."""
+    if encoding == DATA_ENCODING_COLUMNAR and isinstance(data, list):
+        return encode_columnar(data)
+    return data
@@ -13,7 +13,15 @@ from .const import (
     CONF_SENSOR_RECENTLY_ADDED_MOVIE,
     CONF_SENSOR_RECENTLY_ADDED_TVSHOW,
     CONF_SENSOR_SEARCH,
+    DEFAULT_OPTION_ARTWORK_CACHE_SIZE,
+    DEFAULT_OPTION_ARTWORK_PLACEHOLDERS,
+    DEFAULT_OPTION_ARTWORK_PREWARM,
+    DEFAULT_OPTION_ARTWORK_PROXY,
     DEFAULT_OPTION_HIDE_WATCHED,
+    DEFAULT_OPTION_PAYLOAD_COLUMNAR,
+    DEFAULT_OPTION_PAYLOAD_HTTP,
+    DEFAULT_OPTION_PAYLOAD_PATCH,
+    DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW,
     DEFAULT_OPTION_SEARCH_ALBUMS_LIMIT,
     DEFAULT_OPTION_SEARCH_ARTISTS_LIMIT,
     DEFAULT_OPTION_SEARCH_CHANNELS_RADIO_LIMIT,
@@ -33,9 +41,19 @@ from .const import (
     DEFAULT_OPTION_SEARCH_SONGS_LIMIT,
     DEFAULT_OPTION_SEARCH_TVSHOWS_LIMIT,
     DOMAIN,
+    MAX_ARTWORK_CACHE_SIZE,
     MAX_KEEP_ALIVE,
+    MAX_PLAYLIST_COALESCE_WINDOW,
     MAX_SEARCH_LIMIT,
+    OPTION_ARTWORK_CACHE_SIZE,
+    OPTION_ARTWORK_PLACEHOLDERS,
+    OPTION_ARTWORK_PREWARM,
+    OPTION_ARTWORK_PROXY,
     OPTION_HIDE_WATCHED,
+    OPTION_PAYLOAD_COLUMNAR,
+    OPTION_PAYLOAD_HTTP,
+    OPTION_PAYLOAD_PATCH,
+    OPTION_PLAYLIST_COALESCE_WINDOW,
     OPTION_SEARCH_ALBUMS_LIMIT,
     OPTION_SEARCH_ARTISTS_LIMIT,
     OPTION_SEARCH_CHANNELS_RADIO_LIMIT,
@@ -151,6 +169,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             CONF_SENSOR_RECENTLY_ADDED_TVSHOW
         )
         sensor_search_active = self.config_entry.data.get(CONF_SENSOR_SEARCH)
+        sensor_playlist_active = self.config_entry.data.get(CONF_SENSOR_PLAYLIST)
 
         if (
             sensor_recent_movie_active is not None
@@ -166,6 +185,16 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 schema_base,
             )
 
+        if sensor_playlist_active is not None and str(sensor_playlist_active) == "True":
+            # PLAYLIST COALESCE WINDOW
+            schema_base = self.add_int_to_schema(
+                OPTION_PLAYLIST_COALESCE_WINDOW,
+                DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW,
+                0,
+                MAX_PLAYLIST_COALESCE_WINDOW,
+                schema_base,
+            )
+
         if sensor_search_active is not None and str(sensor_search_active) == "True":
             # SEARCH SONGS
             schema_base = self.add_int_to_schema(
@@ -319,6 +348,63 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 schema_base,
             )
 
+        if (
+            sensor_playlist_active is not None and str(sensor_playlist_active) == "True"
+        ) or (sensor_search_active is not None and str(sensor_search_active) == "True"):
+            # PAYLOAD PUBLISHED AS PATCHES
+            schema_base = self.add_to_schema(
+                OPTION_PAYLOAD_PATCH,
+                DEFAULT_OPTION_PAYLOAD_PATCH,
+                bool,
+                schema_base,
+            )
+            # PAYLOAD ENCODED IN COLUMNS
+            schema_base = self.add_to_schema(
+                OPTION_PAYLOAD_COLUMNAR,
+                DEFAULT_OPTION_PAYLOAD_COLUMNAR,
+                bool,
+                schema_base,
+            )
+
+        # PAYLOAD SERVED OVER HTTP
+        schema_base = self.add_to_schema(
+            OPTION_PAYLOAD_HTTP,
+            DEFAULT_OPTION_PAYLOAD_HTTP,
+            bool,
+            schema_base,
+        )
+
+        # ARTWORK PROXY
+        schema_base = self.add_to_schema(
+            OPTION_ARTWORK_PROXY,
+            DEFAULT_OPTION_ARTWORK_PROXY,
+            bool,
+            schema_base,
+        )
+        schema_base = self.add_int_to_schema(
+            OPTION_ARTWORK_CACHE_SIZE,
+            DEFAULT_OPTION_ARTWORK_CACHE_SIZE,
+            1,
+            MAX_ARTWORK_CACHE_SIZE,
+            schema_base,
+        )
+
+        # ARTWORK PREWARMING
+        schema_base = self.add_to_schema(
+            OPTION_ARTWORK_PREWARM,
+            DEFAULT_OPTION_ARTWORK_PREWARM,
+            bool,
+            schema_base,
+        )
+
+        # ARTWORK PLACEHOLDERS
+        schema_base = self.add_to_schema(
+            OPTION_ARTWORK_PLACEHOLDERS,
+            DEFAULT_OPTION_ARTWORK_PLACEHOLDERS,
+            bool,
+            schema_base,
+        )
+
         schema_full = vol.Schema(schema_base)
         return self.async_show_form(
             step_id="init",
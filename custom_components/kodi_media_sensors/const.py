@@ -10,6 +10,8 @@ CONF_KODI_INSTANCE = "kodi_config_entry_id"
 
 MAX_SEARCH_LIMIT = 100
 MAX_KEEP_ALIVE = 1800
+MAX_PLAYLIST_COALESCE_WINDOW = 5000
+MAX_ARTWORK_CACHE_SIZE = 5000
 
 OPTION_HIDE_WATCHED = "hide_watched"
 OPTION_SEARCH_SONGS_LIMIT = "search_songs_limit"
@@ -35,6 +37,16 @@ OPTION_SEARCH_RECENTLY_PLAYED_ALBUMS_LIMIT = "search_recently_played_albums_limi
 
 OPTION_SEARCH_KEEP_ALIVE_TIMER = "search_keep_alive_timer"
 
+OPTION_PLAYLIST_COALESCE_WINDOW = "playlist_coalesce_window"
+
+OPTION_PAYLOAD_HTTP = "payload_http"
+OPTION_PAYLOAD_PATCH = "payload_patch"
+OPTION_PAYLOAD_COLUMNAR = "payload_columnar"
+OPTION_ARTWORK_PROXY = "artwork_proxy"
+OPTION_ARTWORK_CACHE_SIZE = "artwork_cache_size"
+OPTION_ARTWORK_PREWARM = "artwork_prewarm"
+OPTION_ARTWORK_PLACEHOLDERS = "artwork_placeholders"
+
 DEFAULT_OPTION_HIDE_WATCHED = False
 DEFAULT_OPTION_SEARCH_SONGS_LIMIT = 15
 DEFAULT_OPTION_SEARCH_ARTISTS_LIMIT = 10
@@ -57,6 +69,40 @@ DEFAULT_OPTION_SEARCH_RECENTLY_ADDED_MUSICVIDEOS_LIMIT = 20
 DEFAULT_OPTION_SEARCH_RECENTLY_PLAYED_SONGS_LIMIT = 10
 DEFAULT_OPTION_SEARCH_RECENTLY_PLAYED_ALBUMS_LIMIT = 10
 
+DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW = 500  # Expressed in milliseconds
+
+DEFAULT_OPTION_PAYLOAD_HTTP = False
+DEFAULT_OPTION_PAYLOAD_PATCH = False
+DEFAULT_OPTION_PAYLOAD_COLUMNAR = False
+DEFAULT_OPTION_ARTWORK_PROXY = False
+DEFAULT_OPTION_ARTWORK_CACHE_SIZE = 200  # Expressed in MB
+DEFAULT_OPTION_ARTWORK_PREWARM = False
+DEFAULT_OPTION_ARTWORK_PLACEHOLDERS = False
+
+# Payloads served over HTTP
+DATA_PAYLOAD_STORE = "payload_store"
+PAYLOAD_VIEW_URL = "/api/kodi_media_sensors/payload/{entity_id}"
+
+# Recently added lists shared by the sensors of a config entry
+DATA_COORDINATORS = "coordinators"
+
+# Events exchanged by the sensors of a kodi instance
+DATA_EVENT_MANAGERS = "event_managers"
+
+# Artwork served by the proxy
+DATA_ARTWORK_CACHE = "artwork_cache"
+ARTWORK_VIEW_URL = "/api/kodi_media_sensors/artwork/{key}"
+ARTWORK_CACHE_DIRECTORY = ".cache/kodi_media_sensors/artwork"
+ARTWORK_SIZE_THUMBNAIL = "thumbnail"
+ARTWORK_SIZE_POSTER = "poster"
+ARTWORK_SIZE_FANART = "fanart"
+# Width (in pixels) of the artwork served for each size used by the cards
+ARTWORK_SIZES = {
+    ARTWORK_SIZE_THUMBNAIL: 300,
+    ARTWORK_SIZE_POSTER: 500,
+    ARTWORK_SIZE_FANART: 1280,
+}
+
 # Entities name and ID
 ENTITY_SENSOR_RECENTLY_ADDED_TVSHOW = "kodi_media_sensor_recently_added_tvshow"
 ENTITY_SENSOR_RECENTLY_ADDED_MOVIE = "kodi_media_sensor_recently_added_movie"
@@ -72,8 +118,18 @@ ENTITY_NAME_SENSOR_SEARCH = "Kodi Media Sensor Search"
 # Service method
 ATTR_METHOD = "method"
 
+# Payload restored after a restart of home assistant, until the sensor is refreshed
+ATTR_STALE = "stale"
+
 # KODI Constants
 PLAYER_ID_MUSIC = 0
+PLAYER_ID_VIDEO = 1
+PLAYER_ID_PICTURE = 2
+PLAYER_TYPE_MAP = {
+    PLAYER_ID_MUSIC: "audio",
+    PLAYER_ID_VIDEO: "video",
+    PLAYER_ID_PICTURE: "picture",
+}
 PLAYLIST_ID_MUSIC = 0
 PLAYLIST_ID_VIDEO = 1
 PLAYLIST_TYPE_MUSIC = "music"
@@ -87,6 +143,14 @@ PLAYLIST_MAP = {
 
 PLAYLIST_MUSIC_EXTENSIONS_ALLOWED = {".xsp", ".m3u", ".m3u8", ".cue"}
 
+# KODI notifications
+NOTIFICATION_PLAYER_ON_PLAY = "Player.OnPlay"
+NOTIFICATION_PLAYER_ON_AV_START = "Player.OnAVStart"
+NOTIFICATION_PLAYER_ON_STOP = "Player.OnStop"
+NOTIFICATION_VIDEO_LIBRARY_ON_SCAN_FINISHED = "VideoLibrary.OnScanFinished"
+NOTIFICATION_VIDEO_LIBRARY_ON_UPDATE = "VideoLibrary.OnUpdate"
+NOTIFICATION_VIDEO_LIBRARY_ON_REMOVE = "VideoLibrary.OnRemove"
+
 # KODI keys returned in the aswer
 KEY_ADDONS = "addons"
 KEY_ALBUMS = "albums"
@@ -0,0 +1,281 @@
+"""Recently added lists of a kodi instance, fetched once for all the sensors using them."""
+
+from datetime import timedelta
+import logging
+import time
+from typing import Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_OFF
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from pykodi import Kodi
+
+from .adaptive_interval import AdaptiveInterval
+from .const import (
+    DATA_COORDINATORS,
+    DOMAIN,
+    KEY_EPISODES,
+    KEY_MOVIES,
+    MEDIA_TYPE_EPISODE,
+    MEDIA_TYPE_MOVIE,
+    NOTIFICATION_VIDEO_LIBRARY_ON_REMOVE,
+    NOTIFICATION_VIDEO_LIBRARY_ON_SCAN_FINISHED,
+    NOTIFICATION_VIDEO_LIBRARY_ON_UPDATE,
+)
+from .kodi_notification_manager import KodiNotificationManager
+
+_LOGGER = logging.getLogger(__name__)
+
+LIBRARY_NOTIFICATIONS = (
+    NOTIFICATION_VIDEO_LIBRARY_ON_SCAN_FINISHED,
+    NOTIFICATION_VIDEO_LIBRARY_ON_UPDATE,
+    NOTIFICATION_VIDEO_LIBRARY_ON_REMOVE,
+)
+# a scan sends one notification per item, they are grouped in a single refresh
+LIBRARY_REFRESH_DELAY = 5
+# refresh done even without notification, in case some were missed
+SAFETY_NET_INTERVAL = timedelta(hours=1)
+# interval of the refreshes when kodi can't send notifications (http connection)
+POLL_INTERVAL = timedelta(seconds=300)
+# the refreshes are closer after a change of the library, and spaced out while it stays the same
+MIN_POLL_INTERVAL = timedelta(seconds=60)
+MAX_POLL_INTERVAL = timedelta(minutes=30)
+# number of items returned by the VideoLibrary.GetRecentlyAdded* methods of kodi
+RECENTLY_ADDED_LIMIT = 25
+UNWATCHED_FILTER = {"field": "playcount", "operator": "is", "value": "0"}
+
+# media type -> (method of the recently added items, method of the library, key of the result)
+DATASETS = {
+    MEDIA_TYPE_EPISODE: (
+        "VideoLibrary.GetRecentlyAddedEpisodes",
+        "VideoLibrary.GetEpisodes",
+        KEY_EPISODES,
+    ),
+    MEDIA_TYPE_MOVIE: (
+        "VideoLibrary.GetRecentlyAddedMovies",
+        "VideoLibrary.GetMovies",
+        KEY_MOVIES,
+    ),
+}
+
+
+class KodiRecentlyAddedCoordinator(DataUpdateCoordinator):
+    """Fetches the recently added movies or episodes of a kodi instance for all the sensors using them (the recently added sensors, the recently added search).
+
+    Each sensor registers the properties and the number of items it needs, and the list is downloaded once with the union of them. The data is the result of kodi, {"movies": [...], "limits": {...}}. When kodi is connected through the websocket, the list is refreshed by the notifications of the video library, otherwise it is polled.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        kodi: Kodi,
+        kodi_entity_id: str,
+        notification_manager: Optional[KodiNotificationManager],
+        media_type: str,
+        unwatched: bool = False,
+    ) -> None:
+        self.kodi = kodi
+        self._kodi_entity_id = kodi_entity_id
+        self._notification_manager = notification_manager
+        self.media_type = media_type
+        self.unwatched = unwatched
+        self._method, self._unwatched_method, self.result_key = DATASETS[media_type]
+        self._properties: set[str] = set()
+        self._limit = 0
+        self._signature = None
+        self._fetched_at = 0
+        self._full_fetch_requested = True
+        self._listener_count = 0
+        self._unsub_notifications = []
+        initial_interval = SAFETY_NET_INTERVAL if self.push_enabled else POLL_INTERVAL
+        self._interval = AdaptiveInterval(
+            MIN_POLL_INTERVAL,
+            SAFETY_NET_INTERVAL if self.push_enabled else MAX_POLL_INTERVAL,
+            initial_interval,
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"kodi recently added {media_type}s",
+            update_interval=initial_interval,
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=LIBRARY_REFRESH_DELAY, immediate=False
+            ),
+        )
+
+    @property
+    def push_enabled(self) -> bool:
+        return (
+            self._notification_manager is not None
+            and self._notification_manager.can_subscribe
+        )
+
+    def add_consumer(self, properties: list, limit: int = RECENTLY_ADDED_LIMIT):
+        """Registers the properties and the number of items needed by a sensor. The properties or items not downloaded yet are downloaded with the next refresh."""
+        if not self._properties.issuperset(properties) or limit > self._limit:
+            self._properties.update(properties)
+            self._limit = max(self._limit, limit)
+            self._full_fetch_requested = True
+
+    @callback
+    def async_add_listener(self, update_callback, context=None):
+        """Subscribes to the notifications of the video library while sensors listen to the coordinator."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._listener_count += 1
+        if self.push_enabled and not self._unsub_notifications:
+            self._unsub_notifications = [
+                self._notification_manager.async_subscribe(
+                    notification, self._handle_library_notification
+                )
+                for notification in LIBRARY_NOTIFICATIONS
+            ]
+
+        @callback
+        def remove():
+            remove_listener()
+            self._listener_count -= 1
+            if self._listener_count == 0:
+                for unsubscribe in self._unsub_notifications:
+                    unsubscribe()
+                self._unsub_notifications = []
+
+        return remove
+
+    @callback
+    def _handle_library_notification(self, sender, data):
+        """Refreshes the list when the video library changes. The updates and removals of other media types (an album, a movie for the episodes, ...) are ignored."""
+        data = data or {}
+        item_type = (data.get("item") or data).get("type")
+        if item_type is not None and item_type != self.media_type:
+            return
+        self.hass.async_create_task(self.async_request_full_refresh())
+
+    async def async_request_full_refresh(self) -> None:
+        """Requests a refresh downloading the full list, without probing kodi first."""
+        self._full_fetch_requested = True
+        await self.async_request_refresh()
+
+    async def async_get_result(self, properties: list, limit: int) -> dict:
+        """Returns the first items of the list with the given properties, shaped like the result of kodi. The list is refreshed first if no sensor keeps it up to date."""
+        self.add_consumer(properties, limit)
+        if self._listener_count == 0 or self._full_fetch_requested or not self.data:
+            await self.async_refresh()
+        if not self.last_update_success:
+            raise self.last_exception
+        if not self.data or self.data.get("error"):
+            return self.data or {}
+        # the rows are shared with the other sensors, they are copied with the requested properties only
+        keep = set(properties) | {"label", self.media_type + "id"}
+        rows = [
+            {key: value for key, value in row.items() if key in keep}
+            for row in self.data.get(self.result_key, [])[:limit]
+        ]
+        return {self.result_key: rows, "limits": self.data.get("limits")}
+
+    async def _async_update_data(self) -> Optional[dict]:
+        """Refreshes the list and adapts the interval of the next refresh: none while kodi is off (the sensors request a refresh when it is switched on), shorter after a change of the library, longer while it stays the same."""
+        state = self.hass.states.get(self._kodi_entity_id)
+        if state is None or state.state == STATE_OFF:
+            self.update_interval = None
+            return self.data
+        if self._notification_manager is not None:
+            # the kodi integration replaces the notification handlers when it reconnects
+            self._notification_manager.async_ensure_handlers()
+        try:
+            if await self._async_library_unchanged():
+                _LOGGER.debug(
+                    "Recently added %s unchanged, not downloaded again",
+                    self.result_key,
+                )
+                self.update_interval = self._interval.unchanged()
+                return self.data
+            # dateadded is part of the signature compared with the probes
+            result = await self._async_query(
+                sorted(self._properties | {"dateadded"}), self._limit
+            )
+        except Exception as exception:
+            self.update_interval = self._interval.interval
+            raise UpdateFailed(
+                f"Error fetching the recently added {self.result_key}: {exception}"
+            ) from exception
+        signature = self._get_signature(result)
+        if self._signature is not None and signature != self._signature:
+            self.update_interval = self._interval.changed()
+        else:
+            self.update_interval = self._interval.unchanged()
+        self._signature = signature
+        self._fetched_at = time.monotonic()
+        return result
+
+    async def _async_library_unchanged(self) -> bool:
+        """Asks kodi for the number of recently added items and the newest one only (a few hundred bytes), and compares them with the ones of the last download.
+
+        The probe doesn't see the changes of the older items (watched, removed when the list is full), so the full list is downloaded anyway when the refresh comes from a notification of the library, when kodi is switched on, and once every SAFETY_NET_INTERVAL.
+        """
+        full_fetch = (
+            self._full_fetch_requested
+            or self._signature is None
+            or time.monotonic() - self._fetched_at
+            >= SAFETY_NET_INTERVAL.total_seconds()
+        )
+        self._full_fetch_requested = False
+        if full_fetch:
+            return False
+        probe = await self._async_query(["dateadded"], 1)
+        return self._get_signature(probe) == self._signature
+
+    async def _async_query(self, properties: list, limit: int):
+        """Queries the recently added items. The GetRecentlyAdded* methods of kodi can't filter, so the unwatched items are queried from the library, sorted by date added and limited after the filter by kodi."""
+        limits = {"start": 0, "end": limit}
+        if not self.unwatched:
+            return await self.kodi.call_method(
+                self._method, properties=properties, limits=limits
+            )
+        return await self.kodi.call_method(
+            self._unwatched_method,
+            properties=properties,
+            filter=UNWATCHED_FILTER,
+            sort={"method": "dateadded", "order": "descending"},
+            limits=limits,
+        )
+
+    def _get_signature(self, result) -> Optional[tuple]:
+        """Identifies the recently added items of the library by their number and the newest of them."""
+        if not result or result.get("error"):
+            return None
+        items = result.get(self.result_key) or []
+        newest = items[0] if items else {}
+        return (
+            (result.get("limits") or {}).get("total"),
+            newest.get(self.media_type + "id"),
+            newest.get("dateadded"),
+        )
+
+
+def get_recently_added_coordinator(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    kodi: Kodi,
+    kodi_entity_id: str,
+    notification_manager: Optional[KodiNotificationManager],
+    media_type: str,
+    unwatched: bool = False,
+) -> KodiRecentlyAddedCoordinator:
+    """Returns the coordinator shared by the sensors of the config entry (the recently added sensors, the search). The coordinators are dropped when the entry is unloaded, so a reload creates them again with the kodi object, the kodi entity and the notification manager of the new setup."""
+    entries_coordinators = hass.data[DOMAIN].setdefault(DATA_COORDINATORS, {})
+    coordinators = entries_coordinators.get(config_entry.entry_id)
+    if coordinators is None:
+        coordinators = entries_coordinators[config_entry.entry_id] = {}
+        config_entry.async_on_unload(
+            lambda: entries_coordinators.pop(config_entry.entry_id, None)
+        )
+    key = (media_type, unwatched)
+    coordinator = coordinators.get(key)
+    if coordinator is None:
+        coordinator = KodiRecentlyAddedCoordinator(
+            hass, kodi, kodi_entity_id, notification_manager, media_type, unwatched
+        )
+        coordinators[key] = coordinator
+    return coordinator
@@ -1,13 +1,20 @@
-import json
+from abc import ABC, abstractmethod
 import logging
 from typing import Any, Optional
-from urllib import parse
 
 import homeassistant
 from homeassistant.const import STATE_OFF, STATE_ON, STATE_PROBLEM, STATE_UNKNOWN
-from homeassistant.helpers.entity import Entity
+from homeassistant.core import callback
+from homeassistant.helpers.restore_state import RestoredExtraData, RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from pykodi import Kodi
 
+from .artwork import get_url_builder
+from .cards import movie_cards, tvshow_cards
+from .const import ARTWORK_SIZE_FANART, ARTWORK_SIZE_POSTER, ATTR_STALE
+from .coordinator import RECENTLY_ADDED_LIMIT, KodiRecentlyAddedCoordinator
+from .json_encoder import json_dumps
+from .payload_store import PayloadStore, data_attributes
 from .types import ExtraStateAttrs, KodiConfig
 
 _LOGGER = logging.getLogger(__name__)
@@ -15,10 +22,13 @@ _UNIQUE_ID_PREFIX_TV_ADDED = "kms_t_"
 _UNIQUE_ID_PREFIX_MOVIE_ADDED = "kms_m_"
 
 
-class KodiMediaEntity(Entity):
+class KodiMediaEntity(CoordinatorEntity, RestoreEntity, ABC):
+    """Parent class of the recently added sensors. The items are fetched by a KodiRecentlyAddedCoordinator shared with the other sensors of the same kodi instance."""
+
     properties: list[str] = NotImplemented
     result_key: str = NotImplemented
-    update_method: str = NotImplemented
+    # keys of the artwork shown by the cards, with the size requested from the artwork proxy
+    artwork: list[tuple[str, str]] = NotImplemented
 
     def __init__(
         self,
@@ -27,15 +37,21 @@ class KodiMediaEntity(Entity):
         kodi: Kodi,
         kodi_entity_id,
         config: KodiConfig,
-        hide_watched: bool = False,
+        coordinator: KodiRecentlyAddedCoordinator,
     ) -> None:
-        super().__init__()
+        super().__init__(coordinator)
         self._unique_id = unique_id
         self._hass = hass
         self.kodi = kodi
-        self.hide_watched = hide_watched
+        self._payload_store = None
+        self._artwork_cache = None
+        self._artwork_prewarmer = None
+        self._artwork_placeholders = None
+        self._result = None
+        self._stale = False
         self.data = []
         self._state = STATE_OFF
+        coordinator.add_consumer(self.properties, RECENTLY_ADDED_LIMIT)
 
         homeassistant.helpers.event.async_track_state_change_event(
             hass, kodi_entity_id, self.__handle_event
@@ -55,6 +71,7 @@ class KodiMediaEntity(Entity):
         self.base_web_url = (
             f"{protocol}://{auth}{config['host']}:{config['port']}/image/image%3A%2F%2F"
         )
+        self._url_builder = get_url_builder(self.base_web_url)
 
     @property
     def unique_id(self):
@@ -69,26 +86,117 @@ class KodiMediaEntity(Entity):
     def state(self) -> Optional[str]:
         return self._state
 
+    @property
+    def available(self) -> bool:
+        # the failures of kodi are published in the state, as before the coordinator
+        return True
+
+    @property
+    def data(self) -> list:
+        return self._data
+
+    @data.setter
+    def data(self, data: list):
+        self._data = data
+        self._attrs = None
+
+    @property
+    def extra_state_attributes(self) -> ExtraStateAttrs:
+        """Home assistant reads the attributes at every state write, so the card payload is only built again when the data changes."""
+        if self._attrs is None:
+            self._attrs = data_attributes(
+                self._payload_store, self.entity_id, json_dumps(self.build_cards())
+            )
+            if self._stale:
+                self._attrs[ATTR_STALE] = True
+        return self._attrs
+
+    @abstractmethod
+    def build_cards(self) -> list:
+        """Returns the payload of the upcoming-media-card (see cards.py)."""
+
+    def set_artwork_cache(self, artwork_cache):
+        """Publishes the urls of the artwork proxy instead of the urls of kodi."""
+        self._artwork_cache = artwork_cache
+        self._update_url_builder()
+
+    def set_artwork_prewarmer(self, artwork_prewarmer):
+        """Requests the artwork of the new items in the background (see artwork_prewarmer.py)."""
+        self._artwork_prewarmer = artwork_prewarmer
+
+    def set_artwork_placeholders(self, artwork_placeholders):
+        """Publishes the placeholders of the posters and fanarts next to their urls (see artwork_placeholder.py)."""
+        self._artwork_placeholders = artwork_placeholders
+        self._update_url_builder()
+
+    def _update_url_builder(self):
+        self._url_builder = get_url_builder(
+            self.base_web_url,
+            artwork_cache=self._artwork_cache,
+            artwork_placeholders=self._artwork_placeholders,
+        )
+        self._attrs = None
+
+    def set_payload_store(self, payload_store: PayloadStore):
+        """Publishes the data through the HTTP view instead of the data attribute."""
+        self._payload_store = payload_store
+        self._attrs = None
+
+    @property
+    def extra_restore_state_data(self) -> Optional[RestoredExtraData]:
+        """Saves the last items, published again at the next start of home assistant until kodi answers."""
+        if not self.data:
+            return None
+        return RestoredExtraData({"data": self.data})
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self._artwork_placeholders is not None:
+            self.async_on_remove(
+                self._artwork_placeholders.add_listener(self._handle_placeholders_ready)
+            )
+        last_payload = await self.async_get_last_extra_data()
+        if last_payload is not None and not self.data:
+            self.data = last_payload.as_dict().get("data") or []
+            # the cards are flagged as stale until the coordinator refreshes them
+            self._stale = bool(self.data)
+        if self._state != STATE_OFF:
+            await self.coordinator.async_request_full_refresh()
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        if self._payload_store is not None and self.entity_id is not None:
+            self._payload_store.remove(self.entity_id)
+
     async def __handle_event(self, event):
         newstate = event.data.get("new_state").state
-        self._state = STATE_OFF if newstate == STATE_OFF else STATE_ON
-        self._hass.async_create_task(self.async_update_ha_state(True))
-
-    async def async_update(self) -> None:
-        result = None
-        try:
-            if self._state == STATE_ON:
-                result = await self.kodi.call_method(
-                    self.update_method, properties=self.properties
-                )
-        except Exception:
-            _LOGGER.exception("Error updating sensor, is kodi running?")
-            self._state = STATE_OFF
-
-        if result:
-            self._handle_result(result)
+        kodi_off = newstate == STATE_OFF
+        # play/pause transitions of kodi don't change the recently added media, only switching kodi on or off does
+        if kodi_off == (self._state == STATE_OFF):
+            return
+        self._state = STATE_OFF if kodi_off else STATE_ON
+        if kodi_off:
+            self.async_write_ha_state()
         else:
+            await self.coordinator.async_request_full_refresh()
+
+    @callback
+    def _handle_placeholders_ready(self) -> None:
+        """Publishes the cards again with the placeholders computed meanwhile."""
+        if self.data:
+            self._attrs = None
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if not self.coordinator.last_update_success:
+            _LOGGER.warning("Error updating sensor, is kodi running?")
             self._state = STATE_OFF
+        elif self._state != STATE_OFF and self.coordinator.data is not None:
+            if self.coordinator.data is not self._result or self._state != STATE_ON:
+                self._result = self.coordinator.data
+                self._handle_result(self._result)
+        super()._handle_coordinator_update()
 
     def _handle_result(self, result) -> None:
         error = result.get("error")
@@ -100,7 +208,10 @@ class KodiMediaEntity(Entity):
             self._state = STATE_PROBLEM
             return
 
-        new_data: list[dict[str, Any]] = result.get(self.result_key, [])
+        # the coordinator may fetch more items for the search sensor
+        new_data: list[dict[str, Any]] = result.get(self.result_key, [])[
+            :RECENTLY_ADDED_LIMIT
+        ]
         if not new_data:
             _LOGGER.info(
                 "No %s found after requesting data from Kodi, assuming empty."
@@ -109,9 +220,27 @@ class KodiMediaEntity(Entity):
             self._state = STATE_UNKNOWN
             return
 
+        self._prewarm_new_items(new_data)
         self.data = new_data
+        self._stale = False
         self._state = STATE_ON
 
+    def _prewarm_new_items(self, items: list) -> None:
+        """Requests the artwork of the items not in the previous data (restored data included), the artwork of the others was already requested by the cards."""
+        if self._artwork_prewarmer is None:
+            return
+        id_key = self.coordinator.media_type + "id"
+        previous_ids = {item.get(id_key) for item in self.data}
+        for item in items:
+            if item.get(id_key) in previous_ids:
+                continue
+            art = item.get("art") or {}
+            for art_key, size in self.artwork:
+                if art.get(art_key):
+                    self._artwork_prewarmer.prewarm(
+                        self._url_builder.kodi_art_url(art[art_key]), size
+                    )
+
     def get_web_url(self, path: str) -> str:
         """Get the web URL for the provided path.
         This is used for fanart/poster images that are not a http url.  For
@@ -120,12 +249,7 @@ class KodiMediaEntity(Entity):
         :param path: The local/nfs/samba/etc. path.
         :returns: The web url to access the image over http.
         """
-        if path.lower().startswith("http"):
-            return path
-        # This looks strange, but the path needs to be quoted twice in order
-        # to work.
-        quoted_path = parse.quote(parse.quote(path, safe=""))
-        return self.base_web_url + quoted_path
+        return self._url_builder.web_url(path)
 
 
 class KodiRecentlyAddedTVEntity(KodiMediaEntity):
@@ -143,8 +267,11 @@ class KodiRecentlyAddedTVEntity(KodiMediaEntity):
         "showtitle",
         "title",
     ]
-    update_method = "VideoLibrary.GetRecentlyAddedEpisodes"
     result_key = "episodes"
+    artwork = [
+        ("tvshow.fanart", ARTWORK_SIZE_FANART),
+        ("tvshow.poster", ARTWORK_SIZE_POSTER),
+    ]
 
     def __init__(
         self,
@@ -153,7 +280,7 @@ class KodiRecentlyAddedTVEntity(KodiMediaEntity):
         kodi: Kodi,
         kodi_entity_id,
         config: KodiConfig,
-        hide_watched: bool = False,
+        coordinator: KodiRecentlyAddedCoordinator,
     ) -> None:
         super().__init__(
             _UNIQUE_ID_PREFIX_TV_ADDED + config_unique_id,
@@ -161,60 +288,11 @@ class KodiRecentlyAddedTVEntity(KodiMediaEntity):
             kodi,
             kodi_entity_id,
             config,
-            hide_watched,
+            coordinator,
         )
 
-    @property
-    def extra_state_attributes(self) -> ExtraStateAttrs:
-        attrs = {}
-        card_json = [
-            {
-                "title_default": "$title",
-                "line1_default": "$episode",
-                "line2_default": "$release",
-                "line3_default": "$rating - $runtime",
-                "line4_default": "$number",
-                "icon": "mdi:eye-off",
-            }
-        ]
-        for show in self.data:
-            if self.hide_watched and show["playcount"] > 0:
-                continue
-            try:
-                card = {
-                    "airdate": show["dateadded"].replace(" ", "T") + "Z",
-                    "episode": show["title"],
-                    "fanart": "",
-                    "flag": show["playcount"] == 0,
-                    "genres": "",
-                    "number": "S{:0>2}E{:0>2}".format(show["season"], show["episode"]),
-                    "poster": "",
-                    "release": "$day, $date",
-                    "runtime": show["runtime"] // 60,
-                    "title": show["showtitle"],
-                    "studio": "",
-                }
-                rating = round(show["rating"], 1)
-                if rating:
-                    rating = f"\N{BLACK STAR} {rating}"
-                card["rating"] = rating
-                fanart = show["art"].get("tvshow.fanart", "")
-                poster = show["art"].get("tvshow.poster", "")
-                if fanart:
-                    card["fanart"] = self.get_web_url(
-                        parse.unquote(fanart)[8:].strip("/")
-                    )
-                if poster:
-                    card["poster"] = self.get_web_url(
-                        parse.unquote(poster)[8:].strip("/")
-                    )
-            except KeyError:
-                _LOGGER.warning("Error parsing key from tv blob: %s", show)
-                continue
-            card_json.append(card)
-
-        attrs["data"] = json.dumps(card_json)
-        return attrs
+    def build_cards(self) -> list:
+        return tvshow_cards(self.data, self._url_builder)
 
 
 class KodiRecentlyAddedMoviesEntity(KodiMediaEntity):
@@ -230,8 +308,8 @@ class KodiRecentlyAddedMoviesEntity(KodiMediaEntity):
         "studio",
         "title",
     ]
-    update_method = "VideoLibrary.GetRecentlyAddedMovies"
     result_key = "movies"
+    artwork = [("fanart", ARTWORK_SIZE_FANART), ("poster", ARTWORK_SIZE_POSTER)]
 
     def __init__(
         self,
@@ -240,7 +318,7 @@ class KodiRecentlyAddedMoviesEntity(KodiMediaEntity):
         kodi: Kodi,
         kodi_entity_id,
         config: KodiConfig,
-        hide_watched: bool = False,
+        coordinator: KodiRecentlyAddedCoordinator,
     ) -> None:
         super().__init__(
             _UNIQUE_ID_PREFIX_MOVIE_ADDED + config_unique_id,
@@ -248,7 +326,7 @@ class KodiRecentlyAddedMoviesEntity(KodiMediaEntity):
             kodi,
             kodi_entity_id,
             config,
-            hide_watched,
+            coordinator,
         )
 
     # @property
@@ -259,50 +337,5 @@ class KodiRecentlyAddedMoviesEntity(KodiMediaEntity):
     # def name(self) -> str:
     #     return "kodi_recently_added_movies"
 
-    @property
-    def extra_state_attributes(self) -> ExtraStateAttrs:
-        attrs = {}
-        card_json = [
-            {
-                "title_default": "$title",
-                "line1_default": "$genres",
-                "line2_default": "$release",
-                "line3_default": "$rating - $runtime",
-                "line4_default": "$studio",
-                "icon": "mdi:eye-off",
-            }
-        ]
-        for movie in self.data:
-            if self.hide_watched and movie["playcount"] > 0:
-                continue
-            try:
-                card = {
-                    "aired": movie["premiered"],
-                    "airdate": movie["dateadded"].replace(" ", "T") + "Z",
-                    "flag": movie["playcount"] == 0,
-                    "genres": ",".join(movie["genre"]),
-                    "rating": round(movie["rating"], 1),
-                    "release": "$date",
-                    "runtime": movie["runtime"] // 60,
-                    "title": movie["title"],
-                    "studio": ",".join(movie["studio"]),
-                }
-                rating = round(movie["rating"], 1)
-                if rating:
-                    rating = f"\N{BLACK STAR} {rating}"
-                card["rating"] = rating
-                fanart = movie["art"].get("fanart", "")
-                poster = movie["art"].get("poster", "")
-            except KeyError:
-                _LOGGER.warning("Error parsing key from movie blob: %s", movie)
-                continue
-            if fanart:
-                fanart = self.get_web_url(parse.unquote(fanart)[8:].strip("/"))
-            if poster:
-                poster = self.get_web_url(parse.unquote(poster)[8:].strip("/"))
-            card["fanart"] = fanart
-            card["poster"] = poster
-            card_json.append(card)
-
-        attrs["data"] = json.dumps(card_json)
-        return attrs
+    def build_cards(self) -> list:
+        return movie_cards(self.data, self._url_builder)
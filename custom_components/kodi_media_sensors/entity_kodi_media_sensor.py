@@ -1,15 +1,20 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-import json
 import logging
 from typing import Any, Optional
-from urllib import parse
 
 from homeassistant.const import STATE_OFF, STATE_ON, STATE_PROBLEM
-from homeassistant.helpers.entity import Entity
+from homeassistant.core import callback
+from homeassistant.helpers.restore_state import RestoredExtraData, RestoreEntity
 from pykodi import Kodi
 
+from .artwork import get_url_builder
+from .columnar import encode_data
 from .const import (
+    ARTWORK_SIZE_FANART,
+    ARTWORK_SIZE_POSTER,
+    ARTWORK_SIZE_THUMBNAIL,
+    ATTR_STALE,
     DOMAIN,
     KEYS,
     MAP_KEY_MEDIA_TYPE,
@@ -17,18 +22,23 @@ from .const import (
     MEDIA_TYPE_SEASON_DETAIL,
     MEDIA_TYPE_TVSHOW_DETAIL,
 )
+from .json_encoder import json_dumps
+from .json_patch import make_patch
 from .media_sensor_event_manager import MediaSensorEventManager
+from .models import MediaItem, create_item
+from .payload_store import PayloadStore, data_attributes, payload_hash
 from .types import ExtraStateAttrs, KodiConfig
 
 _LOGGER = logging.getLogger(__name__)
 UPDATE_FORMAT = "%Y%m%d%H%M%S%f"
+METHOD_SNAPSHOT = "snapshot"
+# a patch bigger than this part of the data is replaced by a snapshot
+PATCH_MAX_RATIO = 0.5
 
 
-class KodiMediaSensorEntity(Entity, ABC):
+class KodiMediaSensorEntity(RestoreEntity, ABC):
     """This super class should never be instantiated. It's the parent class of all the kodi media sensors"""
 
-    _attrs = {}
-    _data = []
     _meta = []
     _unique_id: str
 
@@ -40,12 +50,32 @@ class KodiMediaSensorEntity(Entity, ABC):
         event_manager: MediaSensorEventManager,
     ) -> None:
         super().__init__()
+        self._attrs = {}
+        self._meta_dirty = True
+        self._data_dirty = True
+        self.__data = []
+        self._payload_store = None
+        self._meta_hash = None
+        self._data_hash = None
+        self._published_hash = None
+        self._payload_patch = False
+        self._data_version = 0
+        self._patch_base = None
+        self._snapshot_requested = False
+        self._data_encoding = None
+        self._published_encoding = None
         self._unique_id = unique_id
         self._kodi = kodi
         self._event_manager = event_manager
+        self._artwork_cache = None
+        self._artwork_prewarmer = None
+        self._artwork_placeholders = None
+        # published url of a poster or fanart -> artwork given by kodi, while its placeholder is not published
+        self._placeholder_arts = {}
+        # urls of the artwork of the data published (restored data included), not prewarmed again
+        self._published_artwork = set()
         self._define_base_url(config)
         self._state = STATE_OFF
-        self._event_manager.register_sensor(self)
 
     @property
     def unique_id(self):
@@ -56,6 +86,115 @@ class KodiMediaSensorEntity(Entity, ABC):
     def name(self):
         return self._unique_id
 
+    @property
+    def _data(self) -> list:
+        return self.__data
+
+    @_data.setter
+    def _data(self, data: list):
+        self.__data = data
+        self._data_dirty = True
+
+    def set_artwork_cache(self, artwork_cache):
+        """Publishes the urls of the artwork proxy instead of the urls of kodi."""
+        self._artwork_cache = artwork_cache
+        self._update_url_builder()
+
+    def set_artwork_prewarmer(self, artwork_prewarmer):
+        """Requests the artwork of the new items in the background (see artwork_prewarmer.py)."""
+        self._artwork_prewarmer = artwork_prewarmer
+
+    def set_artwork_placeholders(self, artwork_placeholders):
+        """Publishes the placeholders of the posters and fanarts next to their urls (see artwork_placeholder.py)."""
+        self._artwork_placeholders = artwork_placeholders
+        self._update_url_builder()
+
+    def _update_url_builder(self):
+        self._url_builder = get_url_builder(
+            self._base_web_url,
+            "@",
+            self._kodi.thumbnail_url,
+            self._artwork_cache,
+            self._artwork_placeholders,
+        )
+
+    def set_payload_store(self, payload_store: PayloadStore):
+        """Publishes the data through the HTTP view instead of the data attribute."""
+        self._payload_store = payload_store
+
+    def set_payload_patch(self, payload_patch: bool):
+        """Publishes the changes of the data as JSON patches instead of the full data."""
+        self._payload_patch = payload_patch
+
+    def set_data_encoding(self, data_encoding: str):
+        """Sets the encoding of the data (see columnar.py). The encoding is announced in the meta, so the cards know how to read the data."""
+        self._data_encoding = data_encoding
+
+    def request_snapshot(self):
+        """Publishes the full data with the next state, for the clients that missed a version."""
+        if not self._payload_patch:
+            return
+        self._snapshot_requested = True
+        self._data_dirty = True
+        self._published_hash = None
+        self._force_update_state()
+
+    @property
+    def is_stale(self) -> bool:
+        """True while the sensor publishes the payload restored after a restart of home assistant."""
+        return len(self._meta) > 0 and self._meta[0].get(ATTR_STALE, False)
+
+    @property
+    def extra_restore_state_data(self) -> Optional[RestoredExtraData]:
+        """Saves the last meta and data, published again at the next start of home assistant until kodi answers."""
+        if len(self._meta) == 0 or len(self._meta[0]) == 0:
+            return None
+        if isinstance(self._data, list):
+            self._format_pending_items(self._data)
+        # the items are serialized by home assistant through their as_dict method
+        return RestoredExtraData({"meta": self._meta, "data": self._data})
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._event_manager.register_sensor(self)
+        if self._artwork_placeholders is not None:
+            self.async_on_remove(
+                self._artwork_placeholders.add_listener(self._handle_placeholders_ready)
+            )
+        last_payload = await self.async_get_last_extra_data()
+        if last_payload is not None:
+            self._restore_payload(last_payload.as_dict())
+        # the first refresh isn't awaited, so the restored payload is published at once
+        self._force_update_state()
+
+    @callback
+    def _handle_placeholders_ready(self):
+        """Publishes the data again with the placeholders computed meanwhile."""
+        if self._data:
+            self._data_dirty = True
+            self._force_update_state()
+
+    def _restore_payload(self, payload: dict):
+        """Publishes the meta and the data saved before the restart, marked as stale in the meta until the sensor is refreshed."""
+        meta = payload.get("meta") or []
+        if len(meta) == 0 or len(meta[0]) == 0:
+            return
+        meta[0][ATTR_STALE] = True
+        # the encoding may have been changed in the options meanwhile
+        meta[0].pop("data_encoding", None)
+        if self._data_encoding is not None:
+            meta[0]["data_encoding"] = self._data_encoding
+        self._meta = meta
+        self._meta_dirty = True
+        self._data = payload.get("data") or []
+        _LOGGER.debug("Restored the payload of %s", self.entity_id)
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        self._event_manager.unregister_sensor(self)
+        if self._payload_store is not None and self.entity_id is not None:
+            self._payload_store.remove(self.entity_id)
+
     def _define_base_url(self, config):
         protocol = "https" if config["ssl"] else "http"
         auth = ""
@@ -64,6 +203,13 @@ class KodiMediaSensorEntity(Entity, ABC):
         self._base_web_url = (
             f"{protocol}://{auth}{config['host']}:{config['port']}/image/image%3A%2F%2F"
         )
+        # added Gautier : character @ causes encoding problems for thumbnails retrieved from http://...music@smb... Therefore, it is escaped in the first quote
+        self._url_builder = get_url_builder(
+            self._base_web_url, "@", self._kodi.thumbnail_url
+        )
+
+    async def handle_media_sensor_event(self, event):
+        """Handles an event sent by another sensor of the same kodi instance. Ignored by default."""
 
     @abstractmethod
     async def async_call_method(self, method, **kwargs):
@@ -85,7 +231,8 @@ class KodiMediaSensorEntity(Entity, ABC):
 
         return data
 
-    async def call_method_kodi_no_result(self, method, args):
+    async def call_method_kodi_no_result(self, method, args) -> bool:
+        """Calls a kodi method which returns nothing. Returns False if it failed."""
         try:
             # Parameters are passed using a **kwargs because the number of JSON parameters depends on each function
             await self._kodi.call_method(method, **args)
@@ -95,6 +242,8 @@ class KodiMediaSensorEntity(Entity, ABC):
                 "Error updating sensor, is kodi running? : %s", str(exception)
             )
             self._state = STATE_PROBLEM
+            return False
+        return True
 
     def _handle_result(self, result) -> list:
         new_data = []
@@ -113,8 +262,10 @@ class KodiMediaSensorEntity(Entity, ABC):
                 default_type = MAP_KEY_MEDIA_TYPE.get(entry)
 
                 if self._hasLeaf(default_type):
+                    # the items are formatted when they are published, as many of them are dropped before (limits, filters, results replaced by a newer one)
+                    new_data = [create_item(item, default_type) for item in new_data]
                     for item in new_data:
-                        self._format_item(item, default_type)
+                        item.pending_format = default_type
                 else:
                     self._format_item(new_data, default_type)
 
@@ -128,11 +279,60 @@ class KodiMediaSensorEntity(Entity, ABC):
             return False
         return True
 
+    def _format_pending_items(self, rows: list):
+        """Formats the items of the data not formatted yet, as well as the items nested in the albums and seasons (songs, episodes). Each item is formatted once, the first time it is published, and replaced by a dict: the JSON encoders serialize the dicts much faster than the items of models.py."""
+        for index, row in enumerate(rows):
+            if isinstance(row, MediaItem):
+                pending_format = row.pending_format
+                row = rows[index] = row.as_dict()
+                if pending_format is not None:
+                    self._format_item(row, pending_format)
+            elif not isinstance(row, dict):
+                continue
+            for value in row.values():
+                if isinstance(value, list):
+                    self._format_pending_items(value)
+
+    def _add_placeholders(self, rows: list, missing: dict):
+        """Adds the placeholders computed so far next to the posters and fanarts of the items, nested items included. The formatted items don't hold the artwork given by kodi anymore, it is found by the published url (see _format_item). The placeholders not computed yet are kept in missing, and published later, see _handle_placeholders_ready."""
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            for key in ("fanart", "poster"):
+                art = self._placeholder_arts.get(row.get(key))
+                if art is None or f"{key}_placeholder" in row:
+                    continue
+                placeholder = self._url_builder.placeholder(art)
+                if placeholder:
+                    row[f"{key}_placeholder"] = placeholder
+                else:
+                    missing[row[key]] = art
+            for value in row.values():
+                if isinstance(value, list):
+                    self._add_placeholders(value, missing)
+
+    def _prewarm(self, url: str, kodi_url: str, size: str):
+        """Requests the artwork of a new item, unless the previous data already published it (its artwork was requested by the cards)."""
+        if self._artwork_prewarmer is not None and url not in self._published_artwork:
+            self._artwork_prewarmer.prewarm(kodi_url, size)
+
+    def _collect_artwork(self, rows: list, urls: set):
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            for key in ("thumbnail", "fanart", "poster"):
+                if row.get(key):
+                    urls.add(row[key])
+            for value in row.values():
+                if isinstance(value, list):
+                    self._collect_artwork(value, urls)
+
     def _format_item(self, item, default_type):
         if not "type" in item:
             item["type"] = default_type
 
-        if "genre" in item:
+        # the genre may already be joined, when it is copied from a formatted tvshow
+        if "genre" in item and isinstance(item["genre"], list):
             item["genre"] = ", ".join(item["genre"])
 
         if "thumbnail" in item:
@@ -140,8 +340,12 @@ class KodiMediaSensorEntity(Entity, ABC):
             if th is None or th == "":
                 del item["thumbnail"]
             else:
-                thumbnail = self._kodi.thumbnail_url(item["thumbnail"])
-                item["thumbnail"] = thumbnail
+                item["thumbnail"] = self._url_builder.thumbnail_url(th)
+                self._prewarm(
+                    item["thumbnail"],
+                    self._url_builder.kodi_thumbnail_url(th),
+                    ARTWORK_SIZE_THUMBNAIL,
+                )
 
         if "art" in item:
             fanart_ref = "fanart"
@@ -151,16 +355,33 @@ class KodiMediaSensorEntity(Entity, ABC):
                 if default_type == MEDIA_TYPE_SEASON_DETAIL:
                     fanart_ref = "tvshow.fanart"
 
-                fanart = item["art"].get(fanart_ref, "")
-                poster = item["art"].get(poster_ref, "")
-                if fanart:
-                    fanart = self.get_web_url(parse.unquote(fanart)[8:].strip("/"))
-                if poster:
-                    poster = self.get_web_url(parse.unquote(poster)[8:].strip("/"))
+                fanart_art = item["art"].get(fanart_ref, "")
+                poster_art = item["art"].get(poster_ref, "")
+                fanart = poster = ""
+                if fanart_art:
+                    fanart = self._url_builder.art_url(fanart_art, ARTWORK_SIZE_FANART)
+                    self._prewarm(
+                        fanart,
+                        self._url_builder.kodi_art_url(fanart_art),
+                        ARTWORK_SIZE_FANART,
+                    )
+                if poster_art:
+                    poster = self._url_builder.art_url(poster_art, ARTWORK_SIZE_POSTER)
+                    self._prewarm(
+                        poster,
+                        self._url_builder.kodi_art_url(poster_art),
+                        ARTWORK_SIZE_POSTER,
+                    )
                 if fanart != "":
                     item["fanart"] = fanart
                 if poster != "":
                     item["poster"] = poster
+                if self._artwork_placeholders is not None:
+                    # the art is dropped below, its placeholders are added when the item is published
+                    if fanart:
+                        self._placeholder_arts[fanart] = fanart_art
+                    if poster:
+                        self._placeholder_arts[poster] = poster_art
             except KeyError:
                 _LOGGER.warning("Error parsing key from movie blob: %s", item)
 
@@ -186,14 +407,7 @@ class KodiMediaSensorEntity(Entity, ABC):
         :param path: The local/nfs/samba/etc. path.
         :returns: The web url to access the image over http.
         """
-        if path.lower().startswith("http"):
-            return path
-        # This looks strange, but the path needs to be quoted twice in order
-        # to work.
-        # added Gautier : character @ causes encoding problems for thumbnails retrieved from http://...music@smb... Therefore, it is escaped in the first quote
-        quoted_path2 = parse.quote(parse.quote(path, safe="@"))
-        encoded = self._base_web_url + quoted_path2
-        return encoded
+        return self._url_builder.web_url(path)
 
     @property
     def domain_unique_id(self) -> str:
@@ -202,16 +416,130 @@ class KodiMediaSensorEntity(Entity, ABC):
     @property
     def extra_state_attributes(self) -> ExtraStateAttrs:
         self.build_attrs()
+        # every state write reads the attributes, so this is the content known by home assistant
+        self._published_hash = self._content_hash()
         return self._attrs
 
+    def _content_hash(self) -> tuple:
+        return (self._state, self._meta_hash, self._data_hash)
+
+    def _force_update_state(self):
+        # self._hass is assigned by the constructor of the sensors, self.hass only once added to home assistant
+        self._hass.async_create_task(self._async_update_state_if_changed())
+
+    async def _async_update_state_if_changed(self):
+        """Updates the sensor and writes its state, unless the state, the meta and the data are the same as the ones already published."""
+        try:
+            await self.async_device_update()
+        except Exception:
+            _LOGGER.exception("Update for %s fails", self.entity_id)
+            return
+        if self.hass is None:
+            # the state is written when the sensor is added to home assistant
+            return
+        self.build_attrs()
+        if self._content_hash() == self._published_hash:
+            _LOGGER.debug("Content of %s unchanged, state not written", self.entity_id)
+            return
+        self.async_write_ha_state()
+
     def add_attribute(self, attribute_name, data, target_attribute_name, target):
         if attribute_name in data:
             target[target_attribute_name] = data[attribute_name]
 
     def build_attrs(self):
-        # self._attrs.clear
-        self._attrs["meta"] = json.dumps(self._meta)
-        self._attrs["data"] = json.dumps(self._data)
+        """Serializes the meta and the data into the attributes. The serialized strings are kept until the meta or the data change, as home assistant reads the attributes at every state write. A meta differing only by its update time is not published again, so refreshes fetching the same content don't produce new states."""
+        if self._meta_dirty:
+            meta = json_dumps(self._meta)
+            meta_hash = payload_hash(json_dumps(self._meta_without_update_time()))
+            if meta_hash != self._meta_hash or "meta" not in self._attrs:
+                self._attrs["meta"] = meta
+                self._meta_hash = meta_hash
+            self._meta_dirty = False
+        encoding = self._meta[0].get("data_encoding") if len(self._meta) > 0 else None
+        if encoding != self._published_encoding:
+            # the data is only encoded when the published meta announces it
+            self._published_encoding = encoding
+            self._data_dirty = True
+        if self._data_dirty:
+            if isinstance(self._data, list):
+                self._format_pending_items(self._data)
+                if self._artwork_placeholders is not None:
+                    missing = {}
+                    self._add_placeholders(self._data, missing)
+                    self._placeholder_arts = missing
+                if self._artwork_prewarmer is not None:
+                    self._published_artwork = set()
+                    self._collect_artwork(self._data, self._published_artwork)
+            encoded_data = encode_data(self._data, encoding)
+            data = json_dumps(encoded_data)
+            data_hash = payload_hash(data)
+            if self._payload_patch:
+                self._build_patch_attrs(encoded_data, data, data_hash)
+            else:
+                self._attrs.update(
+                    data_attributes(self._payload_store, self.entity_id, data)
+                )
+            self._data_hash = data_hash
+            self._data_dirty = False
+
+    def _build_patch_attrs(self, encoded_data, data: str, data_hash: str):
+        """Publishes the JSON patch transforming the previous version of the data into the new one. The patch applies to the data as published, encoded or not (see columnar.py). The full data is published instead for the first version, when it is requested, when the encoding changed, or when the patch is not much smaller."""
+        if data_hash == self._data_hash and not self._snapshot_requested:
+            return
+        if data_hash != self._data_hash:
+            self._data_version += 1
+
+        # only the lists of rows are patched, encoded or not
+        patchable = isinstance(self._data, list)
+        patch = None
+        if (
+            not self._snapshot_requested
+            and patchable
+            and type(self._patch_base) is type(encoded_data)
+        ):
+            patch = json_dumps(
+                {
+                    "from": self._data_version - 1,
+                    "ops": make_patch(self._patch_base, encoded_data),
+                }
+            )
+            if len(patch) > len(data) * PATCH_MAX_RATIO:
+                patch = None
+        self._snapshot_requested = False
+        if not patchable:
+            self._patch_base = None
+        elif encoded_data is self._data:
+            # rows are copied as the entities may change them in place
+            self._patch_base = [
+                dict(row.items()) if isinstance(row, (dict, MediaItem)) else row
+                for row in encoded_data
+            ]
+        else:
+            # the encoded data is built again at each version
+            self._patch_base = encoded_data
+
+        if self._payload_store is not None and self.entity_id is not None:
+            # the payload view always serves the last snapshot
+            self._attrs.update(
+                data_attributes(self._payload_store, self.entity_id, data)
+            )
+        elif patch is None:
+            self._attrs["data"] = data
+        else:
+            self._attrs.pop("data", None)
+
+        if patch is None:
+            self._attrs.pop("data_patch", None)
+        else:
+            self._attrs["data_patch"] = patch
+        self._attrs["data_version"] = self._data_version
+
+    def _meta_without_update_time(self) -> list:
+        return [
+            {key: value for key, value in meta.items() if key != "update_time"}
+            for meta in self._meta
+        ]
 
     def init_meta(self, event_id):
         ds = datetime.now().strftime(UPDATE_FORMAT)
@@ -219,17 +547,20 @@ class KodiMediaSensorEntity(Entity, ABC):
         self._meta[0]["update_time"] = ds
         self._meta[0]["sensor_entity_id"] = self.domain_unique_id
         self._meta[0]["service_domain"] = DOMAIN
-        self.build_attrs()
+        if self._data_encoding is not None:
+            self._meta[0]["data_encoding"] = self._data_encoding
         _LOGGER.debug("Init metadata (event %s)", event_id)
 
     def purge_meta(self, event_id):
         self._meta = [{}]
+        self._meta_dirty = True
         _LOGGER.debug("Purged metadata (event %s)", event_id)
 
     def add_meta(self, key, value):
-        if len(self._meta[0]) == 0:
+        if len(self._meta) == 0 or len(self._meta[0]) == 0:
             self.init_meta("Init because no meta during add")
         self._meta[0][key] = value
+        self._meta_dirty = True
 
     def purge_data(self, event_id):
         self._data = []
@@ -8,10 +8,21 @@ from homeassistant.const import (  # EVENT_STATE_CHANGED,
     STATE_PAUSED,
     STATE_PLAYING,
 )
+from homeassistant.core import callback
 from pykodi import Kodi
 
-from .const import PROPS_ITEM, PROPS_ITEM_LIGHT
-from .entity_kodi_media_sensor import KodiMediaSensorEntity
+from .const import (
+    DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW,
+    MAX_PLAYLIST_COALESCE_WINDOW,
+    NOTIFICATION_PLAYER_ON_AV_START,
+    NOTIFICATION_PLAYER_ON_PLAY,
+    NOTIFICATION_PLAYER_ON_STOP,
+    PLAYER_TYPE_MAP,
+    PROPS_ITEM,
+    PROPS_ITEM_LIGHT,
+)
+from .entity_kodi_media_sensor import METHOD_SNAPSHOT, KodiMediaSensorEntity
+from .kodi_notification_manager import KodiNotificationManager
 from .media_sensor_event_manager import MediaSensorEventManager
 from .types import KodiConfig
 
@@ -24,6 +35,88 @@ ACTION_REFRESH_ALL = "refresh_all"
 ACTION_REFRESH_META = "refresh_meta"
 ACTION_CLEAR = "clear"
 
+METHOD_GOTO = "goto"
+METHOD_REMOVE = "remove"
+METHOD_MOVETO = "moveto"
+METHOD_BATCH = "batch"
+
+# Strength of the refresh actions, used to keep the strongest one of a burst of events
+ACTION_PRIORITY = {
+    ACTION_DO_NOTHING: 0,
+    ACTION_REFRESH_META: 1,
+    ACTION_REFRESH_ALL: 2,
+}
+
+
+def merge_actions(pending, requested):
+    """Returns the action to run when an action is requested while another one is still pending.
+
+    A clear replaces everything pending as kodi went off. A refresh requested after a clear means kodi came back, so the whole playlist must be reloaded.
+    """
+    if pending is None or pending == ACTION_DO_NOTHING:
+        return requested
+    if requested == ACTION_DO_NOTHING:
+        return pending
+    if requested == ACTION_CLEAR:
+        return ACTION_CLEAR
+    if pending == ACTION_CLEAR:
+        return ACTION_REFRESH_ALL
+    if ACTION_PRIORITY[requested] > ACTION_PRIORITY[pending]:
+        return requested
+    return pending
+
+
+def plan_batch(size: int, operations: list) -> list:
+    """Translates the remove / moveto operations of a batch into the positions expected by kodi, which change after each operation.
+
+    The positions of the operations refer to the playlist before the batch, holding size items. A moved item is placed before the item found at position_to (at the end when position_to is size), where this item is at that time, even if it was moved or removed by a previous operation. Returns the (method, original position, kodi position from, kodi position to) of the operations to run in order. Raises a ValueError for an invalid operation, before anything is sent to kodi.
+    """
+    # the original positions in their current order, the removed ones marking their place, and size marking the end
+    slots = list(range(size + 1))
+    removed = set()
+    planned = []
+
+    def check_position(operation, key, upper) -> int:
+        value = operation.get(key)
+        try:
+            position = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"The given {key} is not a position: {value}") from None
+        if position < 0 or position >= upper:
+            raise ValueError(f"The given {key} is out of the playlist: {position}")
+        return position
+
+    def check_not_removed(position):
+        if position in removed:
+            raise ValueError(f"The item at position {position} is already removed")
+
+    def kodi_position(position) -> int:
+        index = slots.index(position)
+        return sum(1 for slot in slots[:index] if slot not in removed)
+
+    for operation in operations:
+        method = operation.get("method")
+        if method == METHOD_REMOVE:
+            position = check_position(operation, "position", size)
+            check_not_removed(position)
+            planned.append((METHOD_REMOVE, position, kodi_position(position), None))
+            removed.add(position)
+        elif method == METHOD_MOVETO:
+            position = check_position(operation, "position_from", size)
+            position_to = check_position(operation, "position_to", size + 1)
+            check_not_removed(position)
+            if position_to == position:
+                continue
+            kodi_from = kodi_position(position)
+            slots.remove(position)
+            slots.insert(slots.index(position_to), position)
+            kodi_to = kodi_position(position)
+            if kodi_to != kodi_from:
+                planned.append((METHOD_MOVETO, position, kodi_from, kodi_to))
+        else:
+            raise ValueError("The given batch operation is unsupported: " + str(method))
+    return planned
+
 
 class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
     _unique_id: str
@@ -32,6 +125,7 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
     _watch_start = None
     _event_context_id = None
     _initialized = False
+    _coalesce_window = DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW
 
     def __init__(
         self,
@@ -41,12 +135,21 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
         kodi_entity_id,
         config: KodiConfig,
         event_manager: MediaSensorEventManager,
+        notification_manager: KodiNotificationManager,
     ):
         super().__init__(
             _UNIQUE_ID_PREFIX + config_unique_id, kodi, config, event_manager
         )
 
         self._hass = hass
+        self._notification_manager = notification_manager
+        self._now_playing = None
+        self._pending_action = None
+        self._pending_event_id = None
+        self._cancel_pending_action = None
+        self._refreshing = False
+        self._queued_action = None
+        self._queued_event_id = None
 
         homeassistant.helpers.event.async_track_state_change_event(
             hass, kodi_entity_id, self.__handle_event
@@ -59,12 +162,68 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
         else:
             self._state = STATE_ON
 
+    def set_coalesce_window(self, window: int):
+        """Assigns the delay (in ms) during which kodi events are grouped in a single refresh. Value provided is enforced between 0 and MAX_PLAYLIST_COALESCE_WINDOW"""
+        value = 0 if window < 0 else window
+        value = (
+            MAX_PLAYLIST_COALESCE_WINDOW
+            if value > MAX_PLAYLIST_COALESCE_WINDOW
+            else value
+        )
+        self._coalesce_window = value
+
+    @property
+    def should_poll(self) -> bool:
+        # the playlist is refreshed by the events of kodi
+        return False
+
+    def _restore_payload(self, payload: dict):
+        # the queue of kodi is lost while it is off, the sensor stays empty until kodi is switched on
+        if self._state == STATE_OFF:
+            return
+        super()._restore_payload(payload)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        for notification in (
+            NOTIFICATION_PLAYER_ON_PLAY,
+            NOTIFICATION_PLAYER_ON_AV_START,
+        ):
+            self.async_on_remove(
+                self._notification_manager.async_subscribe(
+                    notification, self._handle_kodi_play_notification
+                )
+            )
+        self.async_on_remove(
+            self._notification_manager.async_subscribe(
+                NOTIFICATION_PLAYER_ON_STOP, self._handle_kodi_stop_notification
+            )
+        )
+
+    @callback
+    def _handle_kodi_play_notification(self, sender, data):
+        """Keeps the player and the item given by kodi when it starts playing, so the metadata can be updated without querying kodi."""
+        player = (data or {}).get("player") or {}
+        item = (data or {}).get("item") or {}
+        self._now_playing = {
+            "playerid": player.get("playerid"),
+            "id": item.get("id"),
+            "type": item.get("type"),
+        }
+        _LOGGER.debug("Kodi notification, now playing %s", self._now_playing)
+
+    @callback
+    def _handle_kodi_stop_notification(self, sender, data):
+        self._now_playing = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        if self._cancel_pending_action is not None:
+            self._cancel_pending_action()
+            self._cancel_pending_action = None
+
     async def handle_media_sensor_event(self, event):
-        event_id = event
-        await self._update_meta(event_id)
-        await self._update_data(event_id)
-        _LOGGER.debug("number of items in playlist : %s", str(len(self._data)))
-        self._force_update_state()
+        await self._async_refresh(ACTION_REFRESH_ALL, event)
 
     async def __handle_event(self, event):
         old_kodi_event_state = (
@@ -137,57 +296,143 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
             + evt_id
         )
 
+        # the kodi integration replaces the notification handlers when it reconnects, notifications may have been missed in between
+        if self._notification_manager.async_ensure_handlers():
+            self._now_playing = None
+
         self._state = new_entity_state
-        # if sensor_action == ACTION_REFRESH_ALL or sensor_action == ACTION_REFRESH_META:
+        await self._coalesce_action(sensor_action, evt_id)
+
+    async def _coalesce_action(self, sensor_action, evt_id):
+        """Kodi fires several state changes for a single track change or seek. Actions are kept during the coalesce window and only the strongest one is run at the end of it."""
+        self._pending_action = merge_actions(self._pending_action, sensor_action)
+        self._pending_event_id = evt_id
+
+        if self._coalesce_window == 0:
+            await self._run_pending_action()
+        elif self._cancel_pending_action is None:
+            self._cancel_pending_action = homeassistant.helpers.event.async_call_later(
+                self._hass,
+                self._coalesce_window / 1000,
+                self._async_coalesce_window_elapsed,
+            )
+
+    async def _async_coalesce_window_elapsed(self, _now):
+        self._cancel_pending_action = None
+        await self._run_pending_action()
+
+    async def _run_pending_action(self):
+        sensor_action = self._pending_action
+        evt_id = self._pending_event_id
+        self._pending_action = None
+        self._pending_event_id = None
+        await self._async_refresh(sensor_action, evt_id)
+
+    async def _async_refresh(self, sensor_action, evt_id, publish: bool = True):
+        """Runs the action on the sensor. Only one refresh runs at a time: the actions requested while a refresh is running are merged and run once, when the running one is finished."""
+        self._queued_action = merge_actions(self._queued_action, sensor_action)
+        self._queued_event_id = evt_id
+        if self._refreshing:
+            _LOGGER.debug(
+                "Refresh running, action %s queued (event %s)", sensor_action, evt_id
+            )
+            return
+
+        self._refreshing = True
+        must_publish = False
+        first_run = True
+        try:
+            while self._queued_action is not None:
+                sensor_action = self._queued_action
+                evt_id = self._queued_event_id
+                self._queued_action = None
+                self._queued_event_id = None
+                changed = await self._run_action(sensor_action, evt_id)
+                # trailing refreshes were requested by other callers, they are always published
+                if changed and (publish or not first_run):
+                    must_publish = True
+                first_run = False
+        finally:
+            self._refreshing = False
+
+        if must_publish:
+            self._force_update_state()
+
+    async def _run_action(self, sensor_action, evt_id) -> bool:
+        """Runs the action and returns True when something may have changed."""
+        _LOGGER.debug("Running action %s (event %s)", sensor_action, evt_id)
+
+        if sensor_action == ACTION_DO_NOTHING:
+            return False
+
         if sensor_action == ACTION_CLEAR:
             await self._clear_all_data(evt_id)
+        elif sensor_action == ACTION_REFRESH_META:
+            # play/pause and idle transitions don't change the queue, so the published data is kept as is, unless kodi switched to another playlist
+            previous_playlistid = self._playlistid
+            await self._update_meta(evt_id)
+            if self._playlistid != previous_playlistid:
+                await self._update_data(evt_id)
         else:
             await self._update_meta(evt_id)
             await self._update_data(evt_id)
 
         _LOGGER.debug("number of items in playlist : %s", str(len(self._data)))
-        self._force_update_state()
-
-    def _force_update_state(self):
-        # self.schedule_update_ha_state()
-        # await self.async_schedule_update_ha_state()
-        self._hass.async_create_task(self.async_update_ha_state(True))
+        return True
 
     async def async_call_method(self, method, **kwargs):
         _LOGGER.debug("************************************calling method")
         args = ", ".join(f"{key}={value}" for key, value in kwargs.items())
         _LOGGER.debug("calling method %s with arguments %s", method, args)
-        self._meta[0]["method"] = method
-        self._meta[0]["args"] = args
+        if method == METHOD_SNAPSHOT:
+            self.request_snapshot()
+            return
+
+        self.add_meta("method", method)
+        self.add_meta("args", args)
 
-        if method == "goto":
+        if method == METHOD_GOTO:
             item = kwargs.get("item")
             playerid = item.get("playerid")
             position = item.get("position")
             await self._goto(playerid, position)
-        elif method == "remove":
+        elif method == METHOD_REMOVE:
             item = kwargs.get("item")
             playlistid = item.get("playlistid")
             position = item.get("position")
             await self._remove(playlistid, position)
-        elif method == "moveto":
+        elif method == METHOD_MOVETO:
             item = kwargs.get("item")
             playlistid = item.get("playlistid")
             position_from = item.get("position_from")
             position_to = item.get("position_to")
             await self._moveto(playlistid, position_from, position_to)
+        elif method == METHOD_BATCH:
+            item = kwargs.get("item")
+            playlistid = item.get("playlistid")
+            operations = item.get("operations", [])
+            await self._batch(playlistid, operations)
 
     async def _moveto(self, playlistid, position_from, position_to):
         items = await self.kodi_get_playlist_light(playlistid)
         origin = items[int(position_from)]
+        await self._kodi_moveto(playlistid, position_from, position_to, origin)
+
+        # updating data is needed as there is no event fired by kodi
+        await self._async_refresh(ACTION_REFRESH_ALL, "move event")
+
+    async def _kodi_moveto(
+        self, playlistid, position_from, position_to, origin
+    ) -> bool:
         # if position_from < position_to:
         #     position_to = position_to - 1
 
-        await self.call_method_kodi_no_result(
+        if not await self.call_method_kodi_no_result(
             "Playlist.Remove", {"playlistid": playlistid, "position": position_from}
-        )
+        ):
+            return False
 
-        await self.call_method_kodi_no_result(
+        return await self.call_method_kodi_no_result(
             "Playlist.Insert",
             {
                 "playlistid": playlistid,
@@ -196,10 +441,34 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
             },
         )
 
+    async def _batch(self, playlistid, operations):
+        """Runs a list of remove / moveto operations, in the given order, and refreshes the playlist only once at the end.
+
+        The positions refer to the playlist before the batch and are translated by plan_batch, the whole batch being checked before the first change. The playlist is downloaded once, so the moved items are known without asking kodi again. The batch stops at the first operation failing, as the positions of the next ones would be wrong.
+        """
+        items = await self.kodi_get_playlist_light(playlistid)
+        if items is None:
+            items = []
+        planned = plan_batch(len(items), operations)
+
+        for done, (method, position, position_from, position_to) in enumerate(planned):
+            if method == METHOD_REMOVE:
+                succeeded = await self.call_method_kodi_no_result(
+                    "Playlist.Remove",
+                    {"playlistid": playlistid, "position": position_from},
+                )
+            else:
+                succeeded = await self._kodi_moveto(
+                    playlistid, position_from, position_to, items[position]
+                )
+            if not succeeded:
+                _LOGGER.error(
+                    "Batch stopped, %s of %s operations were run", done, len(planned)
+                )
+                break
+
         # updating data is needed as there is no event fired by kodi
-        await self._update_meta("move event")
-        await self._update_data("move event")
-        self._force_update_state()
+        await self._async_refresh(ACTION_REFRESH_ALL, "batch event")
 
     def _get_id_tag(self, type):
         if type == "song":
@@ -214,9 +483,7 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
             "Playlist.Remove", {"playlistid": playlistid, "position": position}
         )
         # updating data is needed as there is no event fired by kodi
-        await self._update_meta("remove event")
-        await self._update_data("remove event")
-        self._force_update_state()
+        await self._async_refresh(ACTION_REFRESH_ALL, "remove event")
 
     async def _goto(self, playerid, to):
         await self.call_method_kodi_no_result(
@@ -228,18 +495,48 @@ class KodiMediaSensorsPlaylistEntity(KodiMediaSensorEntity):
         _LOGGER.debug("> Update Playlist sensor")
 
         # this piece of code is used to initialize the meta and data when the sensor starts for the first time and kodi is not off (and thus the sensor neither as the state is set in the constructor based on the state of kodi)
-        if self._state == STATE_ON and len(self._meta) == 0:
+        if self._state == STATE_ON and (len(self._meta) == 0 or self.is_stale):
             self.init_meta("Kodi Playlist update event")
-            await self._update_meta("Kodi Playlist update event")
-            await self._update_data("Kodi Playlist update event")
+            # the state is written by home assistant after this update
+            await self._async_refresh(
+                ACTION_REFRESH_ALL, "Kodi Playlist update event", publish=False
+            )
             self._initialized = True
 
     async def _clear_all_data(self, event_id):
+        self._now_playing = None
         self.purge_meta(event_id)
         self.purge_data(event_id)
 
     async def _update_meta(self, event_id):
         self.init_meta(event_id)
+
+        now_playing = self._now_playing
+        if (
+            now_playing is not None
+            and now_playing.get("id") is not None
+            and now_playing.get("playerid") in PLAYER_TYPE_MAP
+        ):
+            # kodi already told which item is played by which player, no need to ask it again
+            player_id = now_playing["playerid"]
+            self.add_meta("playlist_id", player_id)
+            self.add_meta("playlist_type", PLAYER_TYPE_MAP[player_id])
+            self.add_meta("currently_playing", now_playing["id"])
+            if "file" not in now_playing:
+                # the notifications don't give the file, it is asked once per item played
+                props_item_playing = await self._kodi.get_playing_item_properties(
+                    {"playerid": player_id}, ["file"]
+                )
+                if props_item_playing.get("id") == now_playing["id"]:
+                    now_playing["file"] = props_item_playing.get("file")
+            if now_playing.get("file") is not None:
+                self.add_meta("currently_playing_file", now_playing["file"])
+            self._playlistid = player_id
+            _LOGGER.debug(
+                "Metadata updated from kodi notification (event %s)", event_id
+            )
+            return
+
         players = await self._kodi.get_players()
         if len(players) == 1:
             player = players[0]
@@ -1,12 +1,14 @@
+from datetime import timedelta
 import logging
 import pathlib
 import time
 from typing import Any
 
 import homeassistant
-from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_PROBLEM
 from pykodi import Kodi
 
+from .adaptive_interval import AdaptiveInterval
 from .const import (
     DEFAULT_OPTION_SEARCH_ALBUMS_LIMIT,
     DEFAULT_OPTION_SEARCH_ARTISTS_LIMIT,
@@ -28,7 +30,9 @@ from .const import (
     DEFAULT_OPTION_SEARCH_TVSHOWS_LIMIT,
     MAX_KEEP_ALIVE,
     MAX_SEARCH_LIMIT,
+    MEDIA_TYPE_EPISODE,
     MEDIA_TYPE_FILE_MUSIC_PLAYLIST,
+    MEDIA_TYPE_MOVIE,
     MEDIA_TYPE_SEASON_DETAIL,
     PLAYER_ID_MUSIC,
     PLAYLIST_ID_MUSIC,
@@ -41,15 +45,16 @@ from .const import (
     PROPS_ARTIST,
     PROPS_CHANNEL,
     PROPS_EPISODE,
+    PROPS_ITEM_ARTISTID,
     PROPS_MOVIE,
     PROPS_MUSICVIDEOS,
     PROPS_RECENT_EPISODES,
     PROPS_SEASON,
     PROPS_SONG,
     PROPS_TVSHOW,
-    PROPS_ITEM_ARTISTID,
 )
-from .entity_kodi_media_sensor import KodiMediaSensorEntity
+from .coordinator import KodiRecentlyAddedCoordinator
+from .entity_kodi_media_sensor import METHOD_SNAPSHOT, KodiMediaSensorEntity
 from .media_sensor_event_manager import MediaSensorEventManager
 from .types import KodiConfig
 
@@ -81,6 +86,10 @@ PLAY_ATTR_FILEMUSICPLAYLIST = "filemusicplaylist"
 ADD_ATTR_POSITION = "position"
 PLAY_POSN = 0
 
+# a search kept alive (keep alive timer 0) is processed again, sooner when its result just changed
+SEARCH_REFRESH_MIN_INTERVAL = timedelta(seconds=60)
+SEARCH_REFRESH_MAX_INTERVAL = timedelta(minutes=30)
+
 
 class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
     _search_start_time = 0
@@ -134,6 +143,11 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
 
         self._hass = hass
         self._kodi = kodi
+        self._recently_added_coordinators = {}
+        self._cancel_scheduled_update = None
+        self._refresh_interval = AdaptiveInterval(
+            SEARCH_REFRESH_MIN_INTERVAL, SEARCH_REFRESH_MAX_INTERVAL
+        )
         homeassistant.helpers.event.async_track_state_change_event(
             hass, kodi_entity_id, self.__handle_event
         )
@@ -246,6 +260,10 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
         value = MAX_SEARCH_LIMIT if value > MAX_SEARCH_LIMIT else value
         self._search_recently_played_albums_limit = value
 
+    def set_recently_added_coordinator(self, coordinator: KodiRecentlyAddedCoordinator):
+        """Takes the recently added movies or episodes from the coordinator shared with the recently added sensors, instead of querying kodi again."""
+        self._recently_added_coordinators[coordinator.media_type] = coordinator
+
     # def set_search_keep_alive_timer(self, value: bool):
     def set_search_keep_alive_timer(self, timer: int):
         """Assigns the search limits for the ALBUMS object in the recently played search. Value provided is enforced between 0 and MAX_SEARCH_LIMIT. timer is expressed in seconds."""
@@ -254,6 +272,24 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
 
         self._search_keep_alive_timer = value
 
+    def _restore_payload(self, payload: dict):
+        super()._restore_payload(payload)
+        if self.is_stale:
+            # the restored result is kept alive as a new one
+            self._search_start_time = time.perf_counter()
+            self._schedule_update()
+
+    @property
+    def should_poll(self) -> bool:
+        # the updates are scheduled by the sensor, see _schedule_update
+        return False
+
+    async def async_will_remove_from_hass(self) -> None:
+        await super().async_will_remove_from_hass()
+        if self._cancel_scheduled_update is not None:
+            self._cancel_scheduled_update()
+            self._cancel_scheduled_update = None
+
     async def __handle_event(self, event):
         new_kodi_event_state = str(event.data.get("new_state").state)
 
@@ -276,67 +312,82 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
             self.init_meta(ctxt_id)
 
         if action != ACTION_DO_NOTHING:
+            self._schedule_update()
             self._force_update_state()
 
     async def async_update(self):
-        """Update is only used to purge the search result"""
+        """Update is only used to initialize the meta, the search result is processed again or purged by _async_scheduled_update"""
         _LOGGER.debug("> Update Search sensor")
 
         if self._state != STATE_OFF and len(self._meta) == 0:
             self.init_meta("Kodi Search update event")
 
-        current_time = time.perf_counter()
-
-        if (
+    def _is_search_kept_alive(self) -> bool:
+        return (
             self._search_keep_alive_timer == 0
-            and "method" in self._meta[0]
-            and self._meta[0]["method"] == METHOD_SEARCH
-        ):
-            method = self._meta[0]["method"]
-            kwargs = self._meta[0]["kwargs"]
+            and len(self._meta) > 0
+            and self._meta[0].get("method") == METHOD_SEARCH
+        )
+
+    def _schedule_update(self):
+        """Schedules the next processing of a search kept alive, or the purge of the search result when its keep alive timer elapses. Nothing is scheduled while kodi is off or without search result."""
+        if self._cancel_scheduled_update is not None:
+            self._cancel_scheduled_update()
+            self._cancel_scheduled_update = None
+        if self._state == STATE_OFF or self.hass is None:
+            return
+        if self._is_search_kept_alive():
+            delay = self._refresh_interval.interval.total_seconds()
+        elif self._search_start_time > 0:
+            elapsed = time.perf_counter() - self._search_start_time
+            delay = max(0, self._search_keep_alive_timer - elapsed)
+        else:
+            return
+        self._cancel_scheduled_update = homeassistant.helpers.event.async_call_later(
+            self._hass, delay, self._async_scheduled_update
+        )
+
+    async def _async_scheduled_update(self, _now):
+        self._cancel_scheduled_update = None
+        if self._is_search_kept_alive():
             _LOGGER.debug(
                 "Search result must be reprocessed. The query is reprocessed."
             )
-            await self.async_call_method(method, **kwargs)
-        elif (
-            self._search_start_time > 0
-            and (current_time - self._search_start_time) > self._search_keep_alive_timer
-        ):
+            kwargs = self._meta[0]["kwargs"]
+            published_hash = self._data_hash
+            await self._search(kwargs)
+            self.add_meta("method", METHOD_SEARCH)
+            self.add_meta("kwargs", kwargs)
+            self.build_attrs()
+            if self._data_hash != published_hash:
+                self._refresh_interval.changed()
+            else:
+                self._refresh_interval.unchanged()
+            self._schedule_update()
+        elif self._search_start_time > 0:
+            if (
+                time.perf_counter() - self._search_start_time
+                < self._search_keep_alive_timer
+            ):
+                # the timer was reset by a later call
+                self._schedule_update()
+                return
             await self._clear_result()
+            self._force_update_state()
 
     async def async_call_method(self, method, **kwargs):
+        if method == METHOD_SNAPSHOT:
+            # the search result is kept alive as is
+            self.request_snapshot()
+            return
+
         self._search_start_time = time.perf_counter()
         args = ", ".join(f"{key}={value}" for key, value in kwargs.items())
         _LOGGER.debug("calling method %s with arguments %s", method, args)
 
         if method == METHOD_SEARCH:
-            item = kwargs.get("item")
-            media_type = item.get("media_type")
-            search_value = item.get("value")
-            if media_type == SEARCH_MEDIA_TYPE_ALL:
-                await self.search(search_value)
-            elif media_type == SEARCH_MEDIA_TYPE_RECENTLY_ADDED:
-                await self.search_recently_added()
-            elif media_type == SEARCH_MEDIA_TYPE_RECENTLY_PLAYED:
-                await self.search_recently_played()
-            elif media_type == SEARCH_MEDIA_TYPE_CURRENT_ARTIST:
-                await self.search_current_artist()
-            elif media_type == SEARCH_MEDIA_TYPE_ARTIST:
-                await self.search_artist(search_value)
-            elif media_type == SEARCH_MEDIA_TYPE_TVSHOW:
-                await self.search_tvshow_detail(search_value)
-            else:
-                raise ValueError("The given media type is unsupported: " + media_type)
-
-            self.init_meta("search method called")
-            if (
-                media_type == SEARCH_MEDIA_TYPE_RECENTLY_ADDED
-                or media_type == SEARCH_MEDIA_TYPE_RECENTLY_PLAYED
-                or search_value is not None
-            ):
-                self.add_meta("search", "true")
-            self._force_update_state()
-
+            await self._search(kwargs)
+            self._refresh_interval.changed()
         elif method == METHOD_CLEAR:
             await self._clear_result()
             self._force_update_state()
@@ -382,11 +433,38 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
         else:
             raise ValueError("The given method is unsupported: " + method)
 
-        self._meta[0]["method"] = method
-        self._meta[0]["kwargs"] = kwargs
+        self.add_meta("method", method)
+        self.add_meta("kwargs", kwargs)
+        # every call resets the keep alive timer of the search result
+        self._schedule_update()
+
+    async def _search(self, kwargs):
+        item = kwargs.get("item")
+        media_type = item.get("media_type")
+        search_value = item.get("value")
+        if media_type == SEARCH_MEDIA_TYPE_ALL:
+            await self.search(search_value)
+        elif media_type == SEARCH_MEDIA_TYPE_RECENTLY_ADDED:
+            await self.search_recently_added()
+        elif media_type == SEARCH_MEDIA_TYPE_RECENTLY_PLAYED:
+            await self.search_recently_played()
+        elif media_type == SEARCH_MEDIA_TYPE_CURRENT_ARTIST:
+            await self.search_current_artist()
+        elif media_type == SEARCH_MEDIA_TYPE_ARTIST:
+            await self.search_artist(search_value)
+        elif media_type == SEARCH_MEDIA_TYPE_TVSHOW:
+            await self.search_tvshow_detail(search_value)
+        else:
+            raise ValueError("The given media type is unsupported: " + media_type)
 
-    def _force_update_state(self):
-        self.hass.async_create_task(self.async_update_ha_state(True))
+        self.init_meta("search method called")
+        if (
+            media_type == SEARCH_MEDIA_TYPE_RECENTLY_ADDED
+            or media_type == SEARCH_MEDIA_TYPE_RECENTLY_PLAYED
+            or search_value is not None
+        ):
+            self.add_meta("search", "true")
+        self._force_update_state()
 
     async def _reset_addons(self):
         self.addons_initialized = False
@@ -793,13 +871,11 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
         )
 
     async def kodi_search_recently_added_movies(self):
-        limits = {"start": 0, "end": self._search_recently_added_movies_limit}
-        return await self.call_method_kodi(
+        return await self.get_recently_added(
+            MEDIA_TYPE_MOVIE,
             "VideoLibrary.GetRecentlyAddedMovies",
-            {
-                "properties": PROPS_MOVIE,
-                "limits": limits,
-            },
+            PROPS_MOVIE,
+            self._search_recently_added_movies_limit,
         )
 
     async def kodi_search_recently_added_musicvideos(self):
@@ -813,20 +889,37 @@ class KodiMediaSensorsSearchEntity(KodiMediaSensorEntity):
         )
 
     async def kodi_search_recently_added_episodes(self):
-        limits = {"start": 0, "end": self._search_recently_added_episodes_limit}
-        result = await self.call_method_kodi(
+        result = await self.get_recently_added(
+            MEDIA_TYPE_EPISODE,
             "VideoLibrary.GetRecentlyAddedEpisodes",
-            {
-                "properties": PROPS_RECENT_EPISODES,
-                "limits": limits,
-            },
+            PROPS_RECENT_EPISODES,
+            self._search_recently_added_episodes_limit,
         )
-        for episode in result:
+        for episode in result or []:
             tvshow = await self.kodi_search_tvshow_details(episode["tvshowid"])
             episode["tvshowtitle"] = tvshow["title"]
             episode["genre"] = tvshow["genre"]
         return result
 
+    async def get_recently_added(self, media_type, method, properties, limit):
+        coordinator = self._recently_added_coordinators.get(media_type)
+        if coordinator is None:
+            return await self.call_method_kodi(
+                method,
+                {"properties": properties, "limits": {"start": 0, "end": limit}},
+            )
+        data = None
+        try:
+            result = await coordinator.async_get_result(properties, limit)
+            data = self._handle_result(result)
+            self._state = STATE_ON
+        except Exception as exception:
+            _LOGGER.exception(
+                "Error updating sensor, is kodi running? : %s", str(exception)
+            )
+            self._state = STATE_PROBLEM
+        return data
+
     async def kodi_search_artists(self, value):
         limits = {"start": 0, "end": self._search_artists_limit}
         return await self.call_method_kodi(
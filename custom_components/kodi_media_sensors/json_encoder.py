@@ -0,0 +1,88 @@
+"""JSON encoders used to serialize the payloads published by the sensors.
+
+The fastest encoder available is used: the helper of home assistant (based on orjson), orjson itself, or the json module of the standard library when none of them is installed.
+"""
+import json
+import logging
+from typing import Any, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+ENCODER_HOMEASSISTANT = "homeassistant"
+ENCODER_ORJSON = "orjson"
+ENCODER_STDLIB = "stdlib"
+
+
+def _default(obj: Any) -> Any:
+    """Serializes the items of models.py (and any object having an as_dict method, like home assistant does)."""
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, default=_default)
+
+
+ENCODERS: dict[str, Callable[[Any], str]] = {ENCODER_STDLIB: _stdlib_dumps}
+
+try:
+    import orjson
+
+    def _orjson_dumps(obj: Any) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS, default=_default
+        ).decode("utf-8")
+
+    ENCODERS[ENCODER_ORJSON] = _orjson_dumps
+except ImportError:
+    pass
+
+try:
+    from homeassistant.helpers.json import json_dumps as _homeassistant_dumps
+
+    ENCODERS[ENCODER_HOMEASSISTANT] = _homeassistant_dumps
+except ImportError:
+    pass
+
+ENCODERS_PREFERENCE = [ENCODER_HOMEASSISTANT, ENCODER_ORJSON, ENCODER_STDLIB]
+
+
+def default_encoder_name() -> str:
+    """Returns the name of the fastest encoder available."""
+    for name in ENCODERS_PREFERENCE:
+        if name in ENCODERS:
+            return name
+    return ENCODER_STDLIB
+
+
+def get_encoder(name: str = None) -> Callable[[Any], str]:
+    """Returns the encoder with the given name, or the fastest one available if no name is given."""
+    if name is None:
+        name = default_encoder_name()
+    if name not in ENCODERS:
+        raise ValueError("The given JSON encoder is not available: " + str(name))
+    return ENCODERS[name]
+
+
+_encoder_name = default_encoder_name()
+_encoder = get_encoder(_encoder_name)
+
+
+def set_encoder(name: str = None) -> None:
+    """Changes the encoder used by json_dumps. Without name, the fastest one available is used."""
+    global _encoder, _encoder_name
+    _encoder = get_encoder(name)
+    _encoder_name = name if name is not None else default_encoder_name()
+    _LOGGER.debug("JSON encoder in use: %s", _encoder_name)
+
+
+def json_dumps(obj: Any) -> str:
+    """Serializes the object with the encoder in use. Objects the fast encoders can't handle (ex: integers bigger than 64 bits) are serialized with the standard library."""
+    try:
+        return _encoder(obj)
+    except (TypeError, ValueError):
+        if _encoder is _stdlib_dumps:
+            raise
+        _LOGGER.debug("Encoder %s failed, using the standard library", _encoder_name)
+        return _stdlib_dumps(obj)
@@ -0,0 +1,121 @@
+"""JSON Patch (RFC 6902) between two versions of the data published by a sensor.
+
+The data of the sensors are lists of rows (songs, episodes, ...), or a dict of lists of rows when they are encoded (see columnar.py). The rows shared by both versions at the start and at the end of a list are skipped, so removing or inserting one item in a long playlist produces a single operation. The remaining rows are compared one by one, key by key.
+"""
+import copy
+from typing import Any
+
+from .models import MediaItem
+
+OP_ADD = "add"
+OP_REMOVE = "remove"
+OP_REPLACE = "replace"
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff_row(row_path: str, previous: Any, current: Any, patch: list) -> None:
+    if previous == current:
+        return
+    if not isinstance(previous, (dict, MediaItem)) or not isinstance(
+        current, (dict, MediaItem)
+    ):
+        patch.append({"op": OP_REPLACE, "path": row_path, "value": current})
+        return
+
+    for key, value in current.items():
+        path = f"{row_path}/{_escape(key)}"
+        if key not in previous:
+            patch.append({"op": OP_ADD, "path": path, "value": value})
+        elif previous[key] != value:
+            patch.append({"op": OP_REPLACE, "path": path, "value": value})
+    for key in previous:
+        if key not in current:
+            patch.append({"op": OP_REMOVE, "path": f"{row_path}/{_escape(key)}"})
+
+
+def make_patch(previous: Any, current: Any) -> list:
+    """Returns the operations transforming the previous data into the current one. The data are lists of rows, or dicts whose lists of rows are compared one by one."""
+    patch = []
+    if isinstance(previous, dict) and isinstance(current, dict):
+        for key, value in current.items():
+            path = "/" + _escape(key)
+            if key not in previous:
+                patch.append({"op": OP_ADD, "path": path, "value": value})
+            elif isinstance(previous[key], list) and isinstance(value, list):
+                _diff_list(path, previous[key], value, patch)
+            elif previous[key] != value:
+                patch.append({"op": OP_REPLACE, "path": path, "value": value})
+        for key in previous:
+            if key not in current:
+                patch.append({"op": OP_REMOVE, "path": "/" + _escape(key)})
+    else:
+        _diff_list("", previous, current, patch)
+    return patch
+
+
+def _diff_list(list_path: str, previous: list, current: list, patch: list) -> None:
+    size = min(len(previous), len(current))
+
+    start = 0
+    while start < size and previous[start] == current[start]:
+        start += 1
+
+    end = 0
+    while (
+        end < size - start
+        and previous[len(previous) - 1 - end] == current[len(current) - 1 - end]
+    ):
+        end += 1
+
+    previous_end = len(previous) - end
+    current_end = len(current) - end
+    common = min(previous_end, current_end) - start
+
+    for offset in range(common):
+        index = start + offset
+        _diff_row(f"{list_path}/{index}", previous[index], current[index], patch)
+
+    # the rows removed are removed from the last one, so the indexes of the others don't move
+    for index in range(previous_end - 1, start + common - 1, -1):
+        patch.append({"op": OP_REMOVE, "path": f"{list_path}/{index}"})
+    for index in range(start + common, current_end):
+        patch.append(
+            {"op": OP_ADD, "path": f"{list_path}/{index}", "value": current[index]}
+        )
+
+
+def apply_patch(document: Any, patch: list) -> Any:
+    """Applies the operations produced by make_patch to a copy of the document."""
+    document = copy.deepcopy(document)
+    for operation in patch:
+        tokens = [_unescape(token) for token in operation["path"].split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if operation["op"] == OP_ADD:
+                parent.insert(index, copy.deepcopy(operation["value"]))
+            elif operation["op"] == OP_REMOVE:
+                del parent[index]
+            elif operation["op"] == OP_REPLACE:
+                parent[index] = copy.deepcopy(operation["value"])
+            else:
+                raise ValueError("Unsupported operation: " + operation["op"])
+        else:
+            if operation["op"] in (OP_ADD, OP_REPLACE):
+                parent[last] = copy.deepcopy(operation["value"])
+            elif operation["op"] == OP_REMOVE:
+                del parent[last]
+            else:
+                raise ValueError("Unsupported operation: " + operation["op"])
+    return document
@@ -0,0 +1,121 @@
+import inspect
+import logging
+from typing import Optional
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KodiNotificationManager:
+    """Dispatches the notifications sent by kodi (Player.OnPlay, ...) to the sensors.
+
+    Notifications are only available when kodi is connected through the websocket. The kodi integration registers its own handlers on that connection, so the handlers found in place are wrapped, not replaced. As the kodi integration registers its handlers again after each websocket reconnection, the sensors must call async_ensure_handlers to be sure to still receive the notifications.
+
+    The handlers are kept by the websocket server of the kodi integration in a private attribute. If it can't be found (another version of the kodi integration or of jsonrpc-websocket), the sensors can't subscribe and keep polling kodi.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._callbacks = {}
+        self._handlers_missing_logged = False
+
+    @property
+    def can_subscribe(self) -> bool:
+        return self._get_handlers() is not None
+
+    def _get_handlers(self) -> Optional[dict]:
+        if not self._connection.can_subscribe:
+            return None
+        server = getattr(self._connection, "server", None)
+        handlers = getattr(server, "_server_request_handlers", None)
+        if not isinstance(handlers, dict):
+            if not self._handlers_missing_logged:
+                _LOGGER.warning(
+                    "The notifications of kodi can't be received, the sensors poll kodi instead"
+                )
+                self._handlers_missing_logged = True
+            return None
+        return handlers
+
+    @callback
+    def async_subscribe(self, method, notification_callback):
+        """Subscribes to a kodi notification. The callback receives the sender and the data of the notification. Returns the function to call to unsubscribe."""
+        callbacks = self._callbacks.setdefault(method, [])
+        callbacks.append(notification_callback)
+        self._install_handler(method)
+
+        @callback
+        def unsubscribe():
+            if notification_callback in callbacks:
+                callbacks.remove(notification_callback)
+
+        return unsubscribe
+
+    @callback
+    def async_ensure_handlers(self) -> bool:
+        """Installs again the handlers replaced by the kodi integration. Returns True if at least one handler had to be installed, which means notifications may have been missed."""
+        installed = False
+        for method, callbacks in self._callbacks.items():
+            # the handlers restored at unload aren't installed again for the notifications nobody listens to anymore
+            if callbacks and self._install_handler(method):
+                installed = True
+        return installed
+
+    @callback
+    def async_restore_handlers(self):
+        """Removes the handlers of this manager from the connection, the handlers found in place when they were installed are called directly again. Called when the integration is unloaded."""
+        handlers = self._get_handlers()
+        if handlers is None:
+            return
+        for method in self._callbacks:
+            wrapper = None
+            handler = handlers.get(method)
+            while getattr(handler, "kms_manager", None) is not None:
+                if handler.kms_manager is self:
+                    if wrapper is not None:
+                        # wrapped by the manager of a newer load of the integration
+                        wrapper.kms_previous = handler.kms_previous
+                    elif handler.kms_previous is not None:
+                        handlers[method] = handler.kms_previous
+                    else:
+                        del handlers[method]
+                    _LOGGER.debug("Handler restored for kodi notification %s", method)
+                    break
+                wrapper = handler
+                handler = handler.kms_previous
+
+    def _install_handler(self, method) -> bool:
+        handlers = self._get_handlers()
+        if handlers is None:
+            return False
+
+        previous = handlers.get(method)
+        if getattr(previous, "kms_manager", None) is self:
+            return False
+
+        # skip the handlers left by the managers of the previous loads of the integration
+        while (
+            getattr(previous, "kms_manager", None) is not None
+            and len(previous.kms_manager._callbacks.get(method, [])) == 0
+        ):
+            previous = previous.kms_previous
+
+        async def handler(sender=None, data=None):
+            # read at each call, as async_restore_handlers may unlink a manager in between
+            previous = handler.kms_previous
+            if previous is not None:
+                result = previous(sender, data)
+                if inspect.isawaitable(result):
+                    await result
+            for notification_callback in list(self._callbacks.get(method, [])):
+                try:
+                    notification_callback(sender, data)
+                except Exception:
+                    _LOGGER.exception("Error handling kodi notification %s", method)
+
+        handler.kms_manager = self
+        handler.kms_previous = previous
+        handlers[method] = handler
+        _LOGGER.debug("Handler installed for kodi notification %s", method)
+        return True
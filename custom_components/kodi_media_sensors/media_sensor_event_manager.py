@@ -1,17 +1,59 @@
+"""Events exchanged by the sensors of a kodi instance."""
+import asyncio
 import logging
+import weakref
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_EVENT_MANAGERS, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class MediaSensorEventManager:
+    """Sends the events of a sensor (an item added to the playlist by the search sensor, ...) to the other sensors of the same kodi instance.
+
+    The sensors are held by weak references and unregistered when they are removed, so the sensors of the previous reloads of the integration are not notified anymore.
+    """
 
-    _sensors = []
+    def __init__(self) -> None:
+        self._sensors = weakref.WeakSet()
 
     def register_sensor(self, sensor):
-        self._sensors.append(sensor)
+        self._sensors.add(sensor)
+
+    def unregister_sensor(self, sensor):
+        self._sensors.discard(sensor)
 
     async def notify_event(self, source_entity, event):
-        for sensor in self._sensors:
-            if sensor._kodi == source_entity._kodi and source_entity != sensor:
-                _LOGGER.debug("Notifying sensor %s", source_entity)
-                await sensor.handle_media_sensor_event(event)
+        """Notifies the other sensors concurrently. The failure of a sensor doesn't prevent the others from handling the event."""
+        sensors = [sensor for sensor in self._sensors if sensor is not source_entity]
+        if not sensors:
+            return
+        _LOGGER.debug("Notifying %s sensors of event %s", len(sensors), event)
+        results = await asyncio.gather(
+            *(sensor.handle_media_sensor_event(event) for sensor in sensors),
+            return_exceptions=True,
+        )
+        for sensor, result in zip(sensors, results):
+            if isinstance(result, Exception):
+                _LOGGER.error(
+                    "Error while sensor %s handled event %s: %s",
+                    sensor.entity_id,
+                    event,
+                    str(result),
+                )
+
+
+def get_event_manager(
+    hass: HomeAssistant, kodi_instance: str
+) -> MediaSensorEventManager:
+    """Returns the event manager shared by the sensors of the same kodi instance. The event manager is released when no sensor uses it anymore."""
+    event_managers = hass.data[DOMAIN].setdefault(
+        DATA_EVENT_MANAGERS, weakref.WeakValueDictionary()
+    )
+    event_manager = event_managers.get(kodi_instance)
+    if event_manager is None:
+        event_manager = MediaSensorEventManager()
+        event_managers[kodi_instance] = event_manager
+    return event_manager
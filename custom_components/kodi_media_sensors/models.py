@@ -0,0 +1,202 @@
+"""Items returned by kodi (songs, albums, episodes, ...).
+
+A playlist or a search result holds thousands of items sharing the same keys, and many of them are dropped before being published (limits, filters, results replaced by a newer one). The items are stored in slotted classes instead of dicts until they are published, which divides their memory by about 3. They keep the dict interface (item["title"], "genre" in item, del item["art"], ...) so the entities don't depend on the class used. The published items are converted with as_dict, as the JSON encoders serialize the dicts several times faster and the keyed access to a dict is faster.
+"""
+from typing import Any, Iterator
+
+from .const import (
+    MEDIA_TYPE_ALBUM,
+    MEDIA_TYPE_CHANNEL,
+    MEDIA_TYPE_EPISODE,
+    MEDIA_TYPE_MOVIE,
+    MEDIA_TYPE_SONG,
+)
+
+MEDIA_TYPE_PLAYLIST_ITEM = "item"
+
+_MISSING = object()
+
+_COMMON_FIELDS = ("id", "type", "label", "title", "thumbnail", "fanart", "poster")
+
+
+class MediaItem:
+    """Base class of the items. The keys without a slot are kept in a dict, created only when needed.
+
+    pending_format holds the type used to format the item (see KodiMediaSensorEntity._format_item) when it is published for the first time, and replaced by a formatted dict.
+    """
+
+    __slots__ = ("_extra", "pending_format")
+    FIELDS: tuple = ()
+    _FIELD_SET: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, data: dict = None) -> None:
+        self._extra = None
+        self.pending_format = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MediaItem, dict)):
+            return self.as_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        if key in self:
+            del self[key]
+        return value
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def as_dict(self) -> dict:
+        result = {
+            key: value
+            for key in self.FIELDS
+            if (value := getattr(self, key, _MISSING)) is not _MISSING
+        }
+        if self._extra is not None:
+            result.update(self._extra)
+        return result
+
+    to_dict = as_dict
+
+
+class Song(MediaItem):
+    FIELDS = _COMMON_FIELDS + (
+        "album",
+        "albumid",
+        "artist",
+        "artistid",
+        "track",
+        "year",
+        "duration",
+        "genre",
+        "file",
+    )
+    __slots__ = FIELDS
+
+
+class Album(MediaItem):
+    FIELDS = _COMMON_FIELDS + ("albumid", "artist", "artistid", "year", "genre")
+    __slots__ = FIELDS
+
+
+class Episode(MediaItem):
+    FIELDS = _COMMON_FIELDS + (
+        "episodeid",
+        "episode",
+        "season",
+        "seasonid",
+        "tvshowid",
+        "tvshowtitle",
+        "rating",
+        "genre",
+    )
+    __slots__ = FIELDS
+
+
+class Movie(MediaItem):
+    FIELDS = _COMMON_FIELDS + ("movieid", "year", "genre", "rating")
+    __slots__ = FIELDS
+
+
+class Channel(MediaItem):
+    FIELDS = _COMMON_FIELDS + (
+        "channelid",
+        "uniqueid",
+        "channeltype",
+        "channel",
+        "channelnumber",
+    )
+    __slots__ = FIELDS
+
+
+class PlaylistItem(MediaItem):
+    FIELDS = Song.FIELDS + ("episode", "season")
+    __slots__ = FIELDS
+
+
+class GenericItem(MediaItem):
+    FIELDS = _COMMON_FIELDS
+    __slots__ = FIELDS
+
+
+MODELS = {
+    MEDIA_TYPE_SONG: Song,
+    MEDIA_TYPE_ALBUM: Album,
+    MEDIA_TYPE_EPISODE: Episode,
+    MEDIA_TYPE_MOVIE: Movie,
+    MEDIA_TYPE_CHANNEL: Channel,
+    MEDIA_TYPE_PLAYLIST_ITEM: PlaylistItem,
+}
+
+
+def create_item(data: dict, media_type: str = None) -> MediaItem:
+    """Creates the item matching the type given by kodi, or the default type of the result."""
+    model = MODELS.get(data.get("type", media_type), GenericItem)
+    return model(data)
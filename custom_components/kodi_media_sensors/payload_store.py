@@ -0,0 +1,63 @@
+"""Payloads of the sensors served over HTTP instead of the state attributes."""
+from dataclasses import dataclass
+import hashlib
+from typing import Optional
+
+from .const import PAYLOAD_VIEW_URL
+
+
+def payload_hash(payload: str) -> str:
+    """Returns the hash identifying the content of a serialized payload."""
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class StoredPayload:
+    body: bytes
+    etag: str
+    version: int
+    url: str
+
+    def attributes(self) -> dict:
+        """Returns the attributes published by the sensor in place of the data."""
+        return {
+            "data_hash": self.etag,
+            "data_version": self.version,
+            "data_url": self.url,
+        }
+
+
+class PayloadStore:
+    """Keeps the last payload published by each sensor. The payloads are served by KodiMediaSensorsPayloadView, so the (big) data doesn't go through the state machine, the recorder and all the frontends."""
+
+    def __init__(self) -> None:
+        self._payloads: dict[str, StoredPayload] = {}
+
+    def publish(self, entity_id: str, payload: str) -> StoredPayload:
+        """Stores the payload of the sensor. The version is only increased when the content changed."""
+        etag = payload_hash(payload)
+        current = self._payloads.get(entity_id)
+        if current is not None and current.etag == etag:
+            return current
+
+        stored = StoredPayload(
+            body=payload.encode("utf-8"),
+            etag=etag,
+            version=current.version + 1 if current is not None else 1,
+            url=PAYLOAD_VIEW_URL.format(entity_id=entity_id),
+        )
+        self._payloads[entity_id] = stored
+        return stored
+
+    def get(self, entity_id: str) -> Optional[StoredPayload]:
+        return self._payloads.get(entity_id)
+
+    def remove(self, entity_id: str) -> None:
+        self._payloads.pop(entity_id, None)
+
+
+def data_attributes(store: Optional[PayloadStore], entity_id: str, data: str) -> dict:
+    """Returns the attributes holding the data of a sensor: the data itself, or its hash, version and url when the payload is served over HTTP."""
+    if store is None or entity_id is None:
+        return {"data": data}
+    return store.publish(entity_id, data).attributes()
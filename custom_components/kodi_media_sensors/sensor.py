@@ -1,13 +1,19 @@
-from datetime import timedelta
 import logging
 
 from homeassistant import config_entries, core
-from homeassistant.components.kodi.const import DATA_KODI, DOMAIN as KODI_DOMAIN
+from homeassistant.components.kodi.const import (
+    DATA_CONNECTION,
+    DATA_KODI,
+    DOMAIN as KODI_DOMAIN,
+)
 from homeassistant.helpers import entity_platform
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_registry import async_get
 import voluptuous as vol
 
+from .artwork_placeholder import ArtworkPlaceholders
+from .artwork_prewarmer import ArtworkPrewarmer
+from .columnar import DATA_ENCODING_COLUMNAR
 from .const import (
     ATTR_METHOD,
     CONF_KODI_INSTANCE,
@@ -15,6 +21,16 @@ from .const import (
     CONF_SENSOR_RECENTLY_ADDED_MOVIE,
     CONF_SENSOR_RECENTLY_ADDED_TVSHOW,
     CONF_SENSOR_SEARCH,
+    DATA_ARTWORK_CACHE,
+    DATA_PAYLOAD_STORE,
+    DEFAULT_OPTION_ARTWORK_CACHE_SIZE,
+    DEFAULT_OPTION_ARTWORK_PLACEHOLDERS,
+    DEFAULT_OPTION_ARTWORK_PREWARM,
+    DEFAULT_OPTION_ARTWORK_PROXY,
+    DEFAULT_OPTION_PAYLOAD_COLUMNAR,
+    DEFAULT_OPTION_PAYLOAD_HTTP,
+    DEFAULT_OPTION_PAYLOAD_PATCH,
+    DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW,
     DEFAULT_OPTION_SEARCH_ALBUMS_LIMIT,
     DEFAULT_OPTION_SEARCH_ARTISTS_LIMIT,
     DEFAULT_OPTION_SEARCH_CHANNELS_RADIO_LIMIT,
@@ -35,7 +51,17 @@ from .const import (
     DEFAULT_OPTION_SEARCH_TVSHOWS_LIMIT,
     DOMAIN,
     KODI_DOMAIN_PLATFORM,
+    MEDIA_TYPE_EPISODE,
+    MEDIA_TYPE_MOVIE,
+    OPTION_ARTWORK_CACHE_SIZE,
+    OPTION_ARTWORK_PLACEHOLDERS,
+    OPTION_ARTWORK_PREWARM,
+    OPTION_ARTWORK_PROXY,
     OPTION_HIDE_WATCHED,
+    OPTION_PAYLOAD_COLUMNAR,
+    OPTION_PAYLOAD_HTTP,
+    OPTION_PAYLOAD_PATCH,
+    OPTION_PLAYLIST_COALESCE_WINDOW,
     OPTION_SEARCH_ALBUMS_LIMIT,
     OPTION_SEARCH_ARTISTS_LIMIT,
     OPTION_SEARCH_CHANNELS_RADIO_LIMIT,
@@ -55,18 +81,18 @@ from .const import (
     OPTION_SEARCH_SONGS_LIMIT,
     OPTION_SEARCH_TVSHOWS_LIMIT,
 )
+from .coordinator import get_recently_added_coordinator
 from .entities import KodiRecentlyAddedMoviesEntity, KodiRecentlyAddedTVEntity
 from .entity_kodi_media_sensor_playlist import KodiMediaSensorsPlaylistEntity
 from .entity_kodi_media_sensor_search import KodiMediaSensorsSearchEntity
-from .media_sensor_event_manager import MediaSensorEventManager
+from .kodi_notification_manager import KodiNotificationManager
+from .media_sensor_event_manager import get_event_manager
 from .utils import find_matching_config_entry
 
 KODI_MEDIA_SENSOR_CALL_METHOD_SCHEMA = cv.make_entity_service_schema(
     {vol.Required(ATTR_METHOD): cv.string}, extra=vol.ALLOW_EXTRA
 )
 
-
-SCAN_INTERVAL = timedelta(seconds=300)
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -101,7 +127,21 @@ async def async_setup_entry(
 
     kodi = data[DATA_KODI]
     sensorsList = list()
-    event_manager = MediaSensorEventManager()
+    event_manager = get_event_manager(hass, conf[CONF_KODI_INSTANCE])
+    notification_manager = KodiNotificationManager(data[DATA_CONNECTION])
+    config_entry.async_on_unload(notification_manager.async_restore_handlers)
+    hide_watched = conf.get(OPTION_HIDE_WATCHED, False)
+
+    def recently_added_coordinator(media_type, unwatched=False):
+        return get_recently_added_coordinator(
+            hass,
+            config_entry,
+            kodi,
+            kodi_entity_id,
+            notification_manager,
+            media_type,
+            unwatched,
+        )
 
     if conf.get(CONF_SENSOR_RECENTLY_ADDED_TVSHOW):
         tv_entity = KodiRecentlyAddedTVEntity(
@@ -110,7 +150,7 @@ async def async_setup_entry(
             kodi,
             kodi_entity_id,
             kodi_config_entry.data,
-            hide_watched=conf.get(OPTION_HIDE_WATCHED, False),
+            recently_added_coordinator(MEDIA_TYPE_EPISODE, hide_watched),
         )
         sensorsList.append(tv_entity)
 
@@ -121,7 +161,7 @@ async def async_setup_entry(
             kodi,
             kodi_entity_id,
             kodi_config_entry.data,
-            hide_watched=conf.get(OPTION_HIDE_WATCHED, False),
+            recently_added_coordinator(MEDIA_TYPE_MOVIE, hide_watched),
         )
         sensorsList.append(movies_entity)
 
@@ -133,7 +173,19 @@ async def async_setup_entry(
             kodi_entity_id,
             kodi_config_entry.data,
             event_manager,
+            notification_manager,
+        )
+        playlist_entity.set_coalesce_window(
+            conf.get(
+                OPTION_PLAYLIST_COALESCE_WINDOW,
+                DEFAULT_OPTION_PLAYLIST_COALESCE_WINDOW,
+            )
+        )
+        playlist_entity.set_payload_patch(
+            conf.get(OPTION_PAYLOAD_PATCH, DEFAULT_OPTION_PAYLOAD_PATCH)
         )
+        if conf.get(OPTION_PAYLOAD_COLUMNAR, DEFAULT_OPTION_PAYLOAD_COLUMNAR):
+            playlist_entity.set_data_encoding(DATA_ENCODING_COLUMNAR)
         sensorsList.append(playlist_entity)
 
     if conf.get(CONF_SENSOR_SEARCH):
@@ -230,14 +282,56 @@ async def async_setup_entry(
                 DEFAULT_OPTION_SEARCH_RECENTLY_ADDED_EPISODES_LIMIT,
             )
         )
+        search_entity.set_recently_added_coordinator(
+            recently_added_coordinator(MEDIA_TYPE_MOVIE)
+        )
+        search_entity.set_recently_added_coordinator(
+            recently_added_coordinator(MEDIA_TYPE_EPISODE)
+        )
         search_entity.set_search_keep_alive_timer(
             conf.get(
                 OPTION_SEARCH_KEEP_ALIVE_TIMER, DEFAULT_OPTION_SEARCH_KEEP_ALIVE_TIMER
             )
         )
+        search_entity.set_payload_patch(
+            conf.get(OPTION_PAYLOAD_PATCH, DEFAULT_OPTION_PAYLOAD_PATCH)
+        )
+        if conf.get(OPTION_PAYLOAD_COLUMNAR, DEFAULT_OPTION_PAYLOAD_COLUMNAR):
+            search_entity.set_data_encoding(DATA_ENCODING_COLUMNAR)
         sensorsList.append(search_entity)
 
-    async_add_entities(sensorsList, update_before_add=True)
+    if conf.get(OPTION_PAYLOAD_HTTP, DEFAULT_OPTION_PAYLOAD_HTTP):
+        payload_store = hass.data[DOMAIN].get(DATA_PAYLOAD_STORE)
+        for sensor in sensorsList:
+            sensor.set_payload_store(payload_store)
+
+    artwork_cache = None
+    if conf.get(OPTION_ARTWORK_PROXY, DEFAULT_OPTION_ARTWORK_PROXY):
+        artwork_cache = hass.data[DOMAIN][DATA_ARTWORK_CACHE]
+        artwork_cache.set_max_size(
+            config_entry.entry_id,
+            conf.get(OPTION_ARTWORK_CACHE_SIZE, DEFAULT_OPTION_ARTWORK_CACHE_SIZE),
+        )
+        config_entry.async_on_unload(
+            lambda: artwork_cache.remove_max_size(config_entry.entry_id)
+        )
+        for sensor in sensorsList:
+            sensor.set_artwork_cache(artwork_cache)
+
+    if conf.get(OPTION_ARTWORK_PREWARM, DEFAULT_OPTION_ARTWORK_PREWARM):
+        artwork_prewarmer = ArtworkPrewarmer(hass, artwork_cache)
+        for sensor in sensorsList:
+            # the playlist items are shown by the cards as soon as they are published
+            if not isinstance(sensor, KodiMediaSensorsPlaylistEntity):
+                sensor.set_artwork_prewarmer(artwork_prewarmer)
+
+    if conf.get(OPTION_ARTWORK_PLACEHOLDERS, DEFAULT_OPTION_ARTWORK_PLACEHOLDERS):
+        artwork_placeholders = ArtworkPlaceholders(hass, artwork_cache)
+        for sensor in sensorsList:
+            sensor.set_artwork_placeholders(artwork_placeholders)
+
+    # the sensors publish their restored payload and are refreshed in the background
+    async_add_entities(sensorsList)
 
     # Register the services
     platform = entity_platform.current_platform.get()
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+import logging
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+
+from .artwork_cache import ArtworkCache
+from .const import ARTWORK_VIEW_URL, PAYLOAD_VIEW_URL
+from .payload_store import PayloadStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Checks the If-None-Match header sent by the client against the etag of the payload."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate.strip('"') == etag:
+            return True
+    return False
+
+
+class KodiMediaSensorsPayloadView(HomeAssistantView):
+    """Serves the data of the sensors publishing their payload over HTTP. The client sends back the ETag it received in If-None-Match and only downloads the data when it changed."""
+
+    url = PAYLOAD_VIEW_URL
+    name = "api:kodi_media_sensors:payload"
+    requires_auth = True
+
+    def __init__(self, store: PayloadStore) -> None:
+        self._store = store
+
+    async def get(self, request: web.Request, entity_id: str) -> web.Response:
+        payload = self._store.get(entity_id)
+        if payload is None:
+            return self.json_message(
+                "No payload published by " + entity_id, HTTPStatus.NOT_FOUND
+            )
+
+        headers = {
+            "ETag": f'"{payload.etag}"',
+            "Cache-Control": "no-cache",
+            "X-Data-Version": str(payload.version),
+        }
+        if etag_matches(request.headers.get("If-None-Match", ""), payload.etag):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        return web.Response(
+            body=payload.body,
+            content_type="application/json",
+            charset="utf-8",
+            headers=headers,
+        )
+
+
+class KodiMediaSensorsArtworkView(HomeAssistantView):
+    """Serves the artwork of kodi from the disk cache of the integration, resized for the cards. Kodi is only requested once per artwork and size, whatever the number of clients.
+
+    The view doesn't require authentication as the cards load the artwork with img tags. Only the artwork published by the sensors can be requested, through the hash of its kodi url, so the kodi credentials never leave home assistant. Nothing is served while no config entry uses the artwork proxy.
+    """
+
+    url = ARTWORK_VIEW_URL
+    name = "api:kodi_media_sensors:artwork"
+    requires_auth = False
+
+    def __init__(self, artwork_cache: ArtworkCache) -> None:
+        self._artwork_cache = artwork_cache
+
+    async def get(self, request: web.Request, key: str) -> web.StreamResponse:
+        if not self._artwork_cache.in_use:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        path = await self._artwork_cache.async_get(key, request.query.get("size"))
+        if path is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        return web.FileResponse(
+            path,
+            headers={"Cache-Control": "public, max-age=86400"},
+        )
@@ -0,0 +1,17 @@
+"""Tests for adaptive_interval.py."""
+from datetime import timedelta
+
+from custom_components.kodi_media_sensors.adaptive_interval import AdaptiveInterval
+
+
+def test_adaptive_interval():
+    """Test the interval doubling while unchanged, and reset by a change."""
+    interval = AdaptiveInterval(
+        timedelta(seconds=60), timedelta(seconds=300), timedelta(seconds=120)
+    )
+    assert timedelta(seconds=120) == interval.interval
+    assert timedelta(seconds=240) == interval.unchanged()
+    assert timedelta(seconds=300) == interval.unchanged()
+    assert timedelta(seconds=300) == interval.unchanged()
+    assert timedelta(seconds=60) == interval.changed()
+    assert timedelta(seconds=120) == interval.unchanged()
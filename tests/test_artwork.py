@@ -0,0 +1,54 @@
+"""Tests for artwork.py."""
+
+from unittest.mock import Mock
+
+from custom_components.kodi_media_sensors.artwork import (
+    ArtworkUrlBuilder,
+    add_placeholders,
+    get_url_builder,
+)
+
+BASE_WEB_URL = "http://kodi:8080/image/image%3A%2F%2F"
+
+
+def test_art_url():
+    """Test the kodi artwork path is quoted twice and the http urls are kept."""
+    builder = ArtworkUrlBuilder(BASE_WEB_URL, "@")
+    assert (
+        BASE_WEB_URL + "smb%253A%252F%252Fuser%40nas%252Fcover.jpg"
+        == builder.art_url("image://smb%3a%2f%2fuser@nas%2fcover.jpg/")
+    )
+    assert "http://host/cover.jpg" == builder.art_url(
+        "image://http%3a%2f%2fhost%2fcover.jpg/"
+    )
+
+
+def test_get_url_builder_shared():
+    """Test the builder is shared by the entities of the same kodi instance."""
+    builder = get_url_builder(BASE_WEB_URL, "@")
+    assert builder is get_url_builder(BASE_WEB_URL, "@")
+    assert builder is not get_url_builder(BASE_WEB_URL, "")
+
+
+def test_get_url_builder_new_kodi():
+    """Test the builder of a kodi instance reloaded calls the thumbnail_url of the new kodi object."""
+    kodi, reloaded_kodi = Mock(), Mock()
+    reloaded_kodi.thumbnail_url.return_value = "http://host/new.jpg"
+    builder = get_url_builder(BASE_WEB_URL, "@", kodi.thumbnail_url)
+    assert builder is get_url_builder(BASE_WEB_URL, "@", kodi.thumbnail_url)
+
+    builder = get_url_builder(BASE_WEB_URL, "@", reloaded_kodi.thumbnail_url)
+    assert "http://host/new.jpg" == builder.thumbnail_url("thumb.jpg")
+    kodi.thumbnail_url.assert_not_called()
+
+
+def test_add_placeholders():
+    """Test only the placeholders already computed are added to the item."""
+    placeholders = Mock()
+    placeholders.get.side_effect = lambda url: (
+        "data:image/jpeg;base64,AA" if url.endswith("poster.jpg") else None
+    )
+    builder = ArtworkUrlBuilder(BASE_WEB_URL, artwork_placeholders=placeholders)
+    item = {}
+    add_placeholders(item, builder, "image://fanart.jpg/", "image://poster.jpg/")
+    assert {"poster_placeholder": "data:image/jpeg;base64,AA"} == item
@@ -0,0 +1,45 @@
+"""Tests for artwork_placeholder.py."""
+import asyncio
+from unittest import mock
+
+from custom_components.kodi_media_sensors import artwork_placeholder
+from custom_components.kodi_media_sensors.artwork_placeholder import ArtworkPlaceholders
+
+URL = "http://kodi:8080/image/image%3A%2F%2Fposter.jpg"
+
+
+def _placeholders():
+    hass = mock.Mock()
+    hass.async_add_executor_job = mock.AsyncMock(
+        side_effect=lambda function, *args: function(*args)
+    )
+    placeholders = ArtworkPlaceholders(hass)
+    placeholders._async_download = mock.AsyncMock()
+    return placeholders
+
+
+def _compute(placeholders, url):
+    placeholders._queued.add(url)
+    placeholders._pending.append(url)
+    asyncio.run(placeholders._async_work())
+
+
+def test_download_failure_not_cached():
+    """Test an artwork not downloaded is requested again, an artwork that can't be read is not."""
+    placeholders = _placeholders()
+    placeholders._async_download.side_effect = ConnectionError("kodi is off")
+    _compute(placeholders, URL)
+    assert URL not in placeholders._placeholders
+    assert URL not in placeholders._queued
+
+    placeholders._async_download.side_effect = None
+    placeholders._async_download.return_value = None
+    _compute(placeholders, URL)
+    assert URL not in placeholders._placeholders
+
+    placeholders._async_download.return_value = b"not an image"
+    with mock.patch.object(artwork_placeholder, "placeholder_data_uri") as decode:
+        decode.return_value = None
+        _compute(placeholders, URL)
+    assert URL in placeholders._placeholders
+    assert placeholders._placeholders[URL] is None
@@ -0,0 +1,28 @@
+"""Tests for cards.py."""
+from custom_components.kodi_media_sensors.artwork import ArtworkUrlBuilder
+from custom_components.kodi_media_sensors.cards import tvshow_cards
+
+BASE_WEB_URL = "http://kodi:8080/image/image%3A%2F%2F"
+
+
+def test_tvshow_cards():
+    """Test the card of an episode, the watched episodes being filtered by kodi."""
+    episode = {
+        "dateadded": "2023-01-15 20:30:00",
+        "title": "Pilot",
+        "showtitle": "Show",
+        "season": 1,
+        "episode": 2,
+        "playcount": 0,
+        "rating": 7.56,
+        "runtime": 2640,
+        "art": {},
+    }
+    watched = dict(episode, playcount=1)
+    cards = tvshow_cards([episode, watched], ArtworkUrlBuilder(BASE_WEB_URL))
+    assert 3 == len(cards)
+    assert "S01E02" == cards[1]["number"]
+    assert "\N{BLACK STAR} 7.6" == cards[1]["rating"]
+    assert 44 == cards[1]["runtime"]
+    assert cards[1]["flag"]
+    assert not cards[2]["flag"]
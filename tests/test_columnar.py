@@ -0,0 +1,22 @@
+"""Tests for columnar.py."""
+from custom_components.kodi_media_sensors.columnar import (
+    DATA_ENCODING_COLUMNAR,
+    decode_columnar,
+    encode_columnar,
+    encode_data,
+)
+
+
+def test_keys_published_once():
+    """Test the rows sharing the same keys share the same schema."""
+    rows = [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}, {"id": 3}]
+    encoded = encode_columnar(rows)
+    assert [["id", "title"], ["id"]] == encoded["schemas"]
+    assert [[0, 1, "a"], [0, 2, "b"], [1, 3]] == encoded["rows"]
+    assert rows == decode_columnar(encoded)
+
+
+def test_encode_data_only_lists():
+    """Test the data which are not a list are published as is."""
+    assert {"id": 1} == encode_data({"id": 1}, DATA_ENCODING_COLUMNAR)
+    assert [{"id": 1}] == encode_data([{"id": 1}])
@@ -0,0 +1,94 @@
+"""Tests for coordinator.py."""
+import asyncio
+import time
+from unittest import mock
+
+from custom_components.kodi_media_sensors.const import DOMAIN
+from custom_components.kodi_media_sensors.coordinator import (
+    SAFETY_NET_INTERVAL,
+    KodiRecentlyAddedCoordinator,
+    get_recently_added_coordinator,
+)
+
+
+def _result(total, *episodes):
+    return {
+        "episodes": [
+            {"episodeid": episode_id, "dateadded": dateadded, "label": "episode"}
+            for episode_id, dateadded in episodes
+        ],
+        "limits": {"start": 0, "end": len(episodes), "total": total},
+    }
+
+
+def _coordinator(result):
+    coordinator = KodiRecentlyAddedCoordinator(
+        mock.Mock(), mock.Mock(), "media_player.kodi", None, "episode"
+    )
+    coordinator.kodi.call_method = mock.AsyncMock()
+    coordinator._signature = coordinator._get_signature(result)
+    coordinator._fetched_at = time.monotonic()
+    coordinator._full_fetch_requested = False
+    return coordinator
+
+
+def test_probe_unchanged():
+    """Test the list isn't downloaded again when the probe matches the last download."""
+    coordinator = _coordinator(
+        _result(3, (12, "2024-01-03 10:00:00"), (11, "2024-01-02 10:00:00"))
+    )
+    coordinator.kodi.call_method.return_value = _result(3, (12, "2024-01-03 10:00:00"))
+
+    assert asyncio.run(coordinator._async_library_unchanged())
+    coordinator.kodi.call_method.assert_awaited_once_with(
+        "VideoLibrary.GetRecentlyAddedEpisodes",
+        properties=["dateadded"],
+        limits={"start": 0, "end": 1},
+    )
+
+
+def test_probe_item_removed_and_added():
+    """Test an item removed and another one added is seen, although the total stays the same."""
+    coordinator = _coordinator(
+        _result(3, (12, "2024-01-03 10:00:00"), (11, "2024-01-02 10:00:00"))
+    )
+    coordinator.kodi.call_method.return_value = _result(3, (13, "2024-01-04 10:00:00"))
+
+    assert not asyncio.run(coordinator._async_library_unchanged())
+
+
+def test_full_fetch_without_probe():
+    """Test kodi isn't probed when the full list is requested, never downloaded, or downloaded too long ago."""
+    result = _result(3, (12, "2024-01-03 10:00:00"))
+    requested, never_fetched, expired = (_coordinator(result) for _ in range(3))
+    requested._full_fetch_requested = True
+    never_fetched._signature = None
+    expired._fetched_at -= SAFETY_NET_INTERVAL.total_seconds()
+
+    for coordinator in (requested, never_fetched, expired):
+        assert not asyncio.run(coordinator._async_library_unchanged())
+        coordinator.kodi.call_method.assert_not_awaited()
+    assert not requested._full_fetch_requested
+
+
+def test_coordinators_dropped_at_unload():
+    """Test the coordinators are shared by the sensors of a config entry, and created again after a reload."""
+    hass = mock.Mock()
+    hass.data = {DOMAIN: {}}
+    config_entry = mock.Mock(entry_id="entry")
+    kodi, notification_manager = mock.Mock(), mock.Mock()
+    coordinator = get_recently_added_coordinator(
+        hass, config_entry, kodi, "media_player.kodi", notification_manager, "movie"
+    )
+    assert coordinator is get_recently_added_coordinator(
+        hass, config_entry, kodi, "media_player.kodi", notification_manager, "movie"
+    )
+
+    unload = config_entry.async_on_unload.call_args[0][0]
+    unload()
+    reloaded_manager = mock.Mock()
+    reloaded = get_recently_added_coordinator(
+        hass, config_entry, kodi, "media_player.kodi", reloaded_manager, "movie"
+    )
+    assert reloaded is not coordinator
+    assert reloaded_manager is reloaded._notification_manager
@@ -0,0 +1,132 @@
+"""Tests for entity_kodi_media_sensor.py."""
+import json
+from unittest import mock
+
+from custom_components.kodi_media_sensors.columnar import (
+    DATA_ENCODING_COLUMNAR,
+    decode_columnar,
+)
+from custom_components.kodi_media_sensors.const import ARTWORK_SIZE_POSTER
+from custom_components.kodi_media_sensors.entity_kodi_media_sensor import (
+    KodiMediaSensorEntity,
+)
+from custom_components.kodi_media_sensors.json_patch import apply_patch
+
+CONFIG = {
+    "host": "127.0.0.1",
+    "password": None,
+    "port": 8080,
+    "ssl": False,
+    "username": None,
+}
+
+
+class MediaSensor(KodiMediaSensorEntity):
+    async def async_call_method(self, method, **kwargs):
+        pass
+
+
+def _media_sensor():
+    sensor = MediaSensor("media_sensor", mock.Mock(), CONFIG, mock.Mock())
+    sensor.entity_id = "sensor.media_sensor"
+    sensor.init_meta("test")
+    return sensor
+
+
+def test_patch_columnar_data():
+    """Test the patch applies to the data published with the columnar encoding."""
+    sensor = _media_sensor()
+    sensor.set_payload_patch(True)
+    sensor.set_data_encoding(DATA_ENCODING_COLUMNAR)
+    sensor.init_meta("test")
+    rows = [{"id": idx, "title": f"song {idx}"} for idx in range(200)]
+    sensor._data = [dict(row) for row in rows]
+    sensor.build_attrs()
+    snapshot = json.loads(sensor._attrs["data"])
+
+    del rows[5]
+    rows[10]["title"] = "renamed"
+    sensor._data = [dict(row) for row in rows]
+    sensor.build_attrs()
+    patch = json.loads(sensor._attrs["data_patch"])
+
+    assert 1 == patch["from"]
+    assert 2 == sensor._attrs["data_version"]
+    assert rows == decode_columnar(apply_patch(snapshot, patch["ops"]))
+
+
+def test_published_items_are_dicts():
+    """Test the items are formatted and converted to dicts when they are published."""
+    sensor = _media_sensor()
+    sensor._data = sensor._handle_result(
+        {"songs": [{"id": 1, "title": "a", "genre": ["Rock", "Pop"]}]}
+    )
+    assert not isinstance(sensor._data[0], dict)
+
+    sensor.build_attrs()
+
+    assert [
+        {"id": 1, "title": "a", "genre": "Rock, Pop", "type": "song"}
+    ] == sensor._data
+    assert type(sensor._data[0]) is dict
+    assert sensor._data == json.loads(sensor._attrs["data"])
+
+
+def test_placeholders_published():
+    """Test the placeholders are published with the formatted items, and the ones computed later with the next publish."""
+    sensor = _media_sensor()
+    placeholders = {}
+    artwork_placeholders = mock.Mock()
+    artwork_placeholders.get.side_effect = placeholders.get
+    sensor.set_artwork_placeholders(artwork_placeholders)
+    sensor._force_update_state = mock.Mock()
+    art = {"poster": "image://poster.jpg/", "fanart": "image://fanart.jpg/"}
+    placeholders[sensor._url_builder.kodi_art_url(art["poster"])] = "data:poster"
+    sensor._data = sensor._handle_result(
+        {"movies": [{"movieid": 1, "title": "a", "art": art}]}
+    )
+
+    sensor.build_attrs()
+    assert "art" not in sensor._data[0]
+    assert "data:poster" == sensor._data[0]["poster_placeholder"]
+    assert "fanart_placeholder" not in sensor._data[0]
+
+    placeholders[sensor._url_builder.kodi_art_url(art["fanart"])] = "data:fanart"
+    sensor._handle_placeholders_ready()
+    sensor.build_attrs()
+    row = json.loads(sensor._attrs["data"])[0]
+    assert "data:poster" == row["poster_placeholder"]
+    assert "data:fanart" == row["fanart_placeholder"]
+    assert {} == sensor._placeholder_arts
+
+
+def test_artwork_of_new_items_prewarmed():
+    """Test only the artwork not published by the previous data is prewarmed, the restored data included."""
+    sensor = _media_sensor()
+    prewarmer = mock.Mock()
+    sensor.set_artwork_prewarmer(prewarmer)
+    old_art = {"poster": "image://old.jpg/"}
+    sensor._data = [
+        {
+            "id": 1,
+            "type": "movie",
+            "poster": sensor._url_builder.art_url(
+                old_art["poster"], ARTWORK_SIZE_POSTER
+            ),
+        }
+    ]
+    sensor.build_attrs()
+
+    sensor._data = sensor._handle_result(
+        {
+            "movies": [
+                {"movieid": 1, "title": "old", "art": old_art},
+                {"movieid": 2, "title": "new", "art": {"poster": "image://new.jpg/"}},
+            ]
+        }
+    )
+    sensor.build_attrs()
+
+    prewarmer.prewarm.assert_called_once_with(
+        sensor._url_builder.kodi_art_url("image://new.jpg/"), ARTWORK_SIZE_POSTER
+    )
@@ -0,0 +1,248 @@
+"""Tests for entity_kodi_media_sensor_playlist.py."""
+import asyncio
+from unittest import mock
+
+from homeassistant.const import STATE_OFF
+import pytest
+
+from custom_components.kodi_media_sensors.entity_kodi_media_sensor_playlist import (
+    ACTION_CLEAR,
+    ACTION_DO_NOTHING,
+    ACTION_REFRESH_ALL,
+    ACTION_REFRESH_META,
+    METHOD_MOVETO,
+    METHOD_REMOVE,
+    KodiMediaSensorsPlaylistEntity,
+    merge_actions,
+    plan_batch,
+)
+
+CONFIG = {
+    "host": "127.0.0.1",
+    "password": None,
+    "port": 8080,
+    "ssl": False,
+    "username": None,
+}
+
+
+def _playlist_entity(coalesce_window=0, kodi_state="playing"):
+    hass = mock.Mock()
+    hass.states.get.return_value.state = kodi_state
+    with mock.patch("homeassistant.helpers.event.async_track_state_change_event"):
+        entity = KodiMediaSensorsPlaylistEntity(
+            "playlist",
+            hass,
+            mock.Mock(),
+            "media_player.kodi",
+            CONFIG,
+            mock.Mock(),
+            mock.Mock(),
+        )
+    entity.set_coalesce_window(coalesce_window)
+    entity._run_action = mock.AsyncMock(return_value=True)
+    entity._force_update_state = mock.Mock()
+    return entity
+
+
+def test_merge_actions():
+    """Test the strongest action is kept, and a clear is followed by a full refresh."""
+    assert ACTION_REFRESH_META == merge_actions(None, ACTION_REFRESH_META)
+    assert ACTION_REFRESH_META == merge_actions(ACTION_DO_NOTHING, ACTION_REFRESH_META)
+    assert ACTION_REFRESH_META == merge_actions(ACTION_REFRESH_META, ACTION_DO_NOTHING)
+    assert ACTION_REFRESH_ALL == merge_actions(ACTION_REFRESH_META, ACTION_REFRESH_ALL)
+    assert ACTION_REFRESH_ALL == merge_actions(ACTION_REFRESH_ALL, ACTION_REFRESH_META)
+    assert ACTION_CLEAR == merge_actions(ACTION_REFRESH_ALL, ACTION_CLEAR)
+    assert ACTION_CLEAR == merge_actions(ACTION_REFRESH_META, ACTION_CLEAR)
+    assert ACTION_CLEAR == merge_actions(ACTION_CLEAR, ACTION_DO_NOTHING)
+    # kodi came back after going off, the playlist may have changed meanwhile
+    assert ACTION_REFRESH_ALL == merge_actions(ACTION_CLEAR, ACTION_REFRESH_META)
+    assert ACTION_REFRESH_ALL == merge_actions(ACTION_CLEAR, ACTION_REFRESH_ALL)
+
+
+def test_coalesce_action_burst():
+    """Test a burst of events within the window runs a single refresh with the strongest action."""
+    entity = _playlist_entity(coalesce_window=300)
+    with mock.patch("homeassistant.helpers.event.async_call_later") as async_call_later:
+
+        async def burst():
+            await entity._coalesce_action(ACTION_REFRESH_META, "event 1")
+            await entity._coalesce_action(ACTION_REFRESH_ALL, "event 2")
+            await entity._coalesce_action(ACTION_REFRESH_META, "event 3")
+            entity._run_action.assert_not_awaited()
+            window_elapsed = async_call_later.call_args[0][2]
+            await window_elapsed(None)
+
+        asyncio.run(burst())
+
+    async_call_later.assert_called_once()
+    entity._run_action.assert_awaited_once_with(ACTION_REFRESH_ALL, "event 3")
+    entity._force_update_state.assert_called_once()
+
+
+def test_coalesce_action_without_window():
+    """Test the action is run at once when the window is 0."""
+    entity = _playlist_entity(coalesce_window=0)
+    asyncio.run(entity._coalesce_action(ACTION_CLEAR, "event 1"))
+    entity._run_action.assert_awaited_once_with(ACTION_CLEAR, "event 1")
+
+
+def test_update_meta_from_notification():
+    """Test the meta is taken from the notification, the file being asked once per item played."""
+    entity = _playlist_entity()
+    entity._kodi.get_playing_item_properties = mock.AsyncMock(
+        return_value={"id": 12, "file": "smb://nas/song.mp3"}
+    )
+    entity._kodi.get_players = mock.AsyncMock()
+    entity._handle_kodi_play_notification(
+        "xbmc", {"player": {"playerid": 0}, "item": {"id": 12, "type": "song"}}
+    )
+
+    asyncio.run(entity._update_meta("event 1"))
+    asyncio.run(entity._update_meta("event 2"))
+
+    assert 12 == entity._meta[0]["currently_playing"]
+    assert "smb://nas/song.mp3" == entity._meta[0]["currently_playing_file"]
+    assert 0 == entity._meta[0]["playlist_id"]
+    entity._kodi.get_playing_item_properties.assert_awaited_once()
+    entity._kodi.get_players.assert_not_awaited()
+
+
+def test_refresh_single_flight():
+    """Test the actions requested during a refresh are merged in a single trailing refresh."""
+    entity = _playlist_entity()
+
+    async def run_action(sensor_action, evt_id):
+        if evt_id == "event 1":
+            await entity._async_refresh(ACTION_REFRESH_META, "event 2")
+            await entity._async_refresh(ACTION_CLEAR, "event 3")
+            await entity._async_refresh(ACTION_REFRESH_META, "event 4")
+        return True
+
+    entity._run_action.side_effect = run_action
+    asyncio.run(entity._async_refresh(ACTION_REFRESH_META, "event 1"))
+
+    assert [
+        mock.call(ACTION_REFRESH_META, "event 1"),
+        mock.call(ACTION_REFRESH_ALL, "event 4"),
+    ] == entity._run_action.await_args_list
+    entity._force_update_state.assert_called_once()
+    assert not entity._refreshing
+
+
+def test_refresh_trailing_run_published():
+    """Test a trailing refresh requested by another caller is published, even when the first one isn't."""
+    entity = _playlist_entity()
+
+    async def run_action(sensor_action, evt_id):
+        if evt_id == "update":
+            await entity._async_refresh(ACTION_REFRESH_ALL, "item added")
+        return True
+
+    entity._run_action.side_effect = run_action
+    asyncio.run(entity._async_refresh(ACTION_REFRESH_ALL, "update", publish=False))
+
+    assert 2 == entity._run_action.await_count
+    entity._force_update_state.assert_called_once()
+
+
+def test_plan_batch_original_positions():
+    """Test the positions of the playlist before the batch are translated into the positions of kodi."""
+    operations = [
+        {"method": "remove", "position": 5},
+        {"method": "remove", "position": 6},
+        # a block moved to the same position keeps its order
+        {"method": "moveto", "position_from": 8, "position_to": 2},
+        {"method": "moveto", "position_from": 9, "position_to": 2},
+        # moved before the place of a removed item
+        {"method": "moveto", "position_from": 0, "position_to": 6},
+        # moved at the end
+        {"method": "moveto", "position_from": 1, "position_to": 10},
+    ]
+    assert [
+        (METHOD_REMOVE, 5, 5, None),
+        (METHOD_REMOVE, 6, 5, None),
+        (METHOD_MOVETO, 8, 6, 2),
+        (METHOD_MOVETO, 9, 7, 3),
+        (METHOD_MOVETO, 0, 0, 6),
+        (METHOD_MOVETO, 1, 0, 7),
+    ] == plan_batch(10, operations)
+
+
+def test_plan_batch_invalid_operations():
+    """Test the whole batch is rejected when one of its operations is invalid."""
+    invalid_batches = [
+        [{"method": "remove", "position": 1}, {"method": "goto", "position": 2}],
+        [{"method": "remove", "position": 1}, {"method": "remove", "position": 1}],
+        [{"method": "remove", "position": 10}],
+        [{"method": "moveto", "position_from": 1, "position_to": -1}],
+        [{"method": "moveto", "position_from": 1, "position_to": 11}],
+        [{"method": "moveto", "position_from": 1}],
+    ]
+    for operations in invalid_batches:
+        with pytest.raises(ValueError):
+            plan_batch(10, operations)
+
+
+def test_batch_stops_at_first_failure():
+    """Test the operations following a failure are not sent to kodi."""
+    entity = _playlist_entity()
+    entity.kodi_get_playlist_light = mock.AsyncMock(
+        return_value=[{"id": i, "type": "song"} for i in range(4)]
+    )
+    entity.call_method_kodi_no_result = mock.AsyncMock(side_effect=[True, False])
+    entity._async_refresh = mock.AsyncMock()
+    operations = [{"method": "remove", "position": i} for i in range(3)]
+
+    asyncio.run(entity._batch(0, operations))
+
+    assert 2 == entity.call_method_kodi_no_result.await_count
+    entity._async_refresh.assert_awaited_once()
+
+
+def test_batch_invalid_not_sent():
+    """Test nothing is sent to kodi when the batch is invalid."""
+    entity = _playlist_entity()
+    entity.kodi_get_playlist_light = mock.AsyncMock(
+        return_value=[{"id": i, "type": "song"} for i in range(4)]
+    )
+    entity.call_method_kodi_no_result = mock.AsyncMock(return_value=True)
+    operations = [
+        {"method": "remove", "position": 0},
+        {"method": "moveto", "position_from": 1, "position_to": -1},
+    ]
+
+    with pytest.raises(ValueError):
+        asyncio.run(entity._batch(0, operations))
+
+    entity.call_method_kodi_no_result.assert_not_awaited()
+
+
+def test_force_update_state_before_added():
+    """Test an event received before the sensor is added to home assistant doesn't fail."""
+    entity = _playlist_entity()
+    del entity._force_update_state
+    entity.hass = None
+    entity.async_device_update = mock.AsyncMock()
+    entity.async_write_ha_state = mock.Mock()
+
+    entity._force_update_state()
+    asyncio.run(entity._hass.async_create_task.call_args[0][0])
+
+    entity.async_device_update.assert_awaited_once()
+    entity.async_write_ha_state.assert_not_called()
+
+
+def test_payload_not_restored_with_kodi_off():
+    """Test the previous queue isn't published when kodi is off at startup."""
+    payload = {"meta": [{"playlist_id": 0}], "data": [{"id": 12, "type": "song"}]}
+    entity = _playlist_entity(kodi_state=STATE_OFF)
+    entity._restore_payload(payload)
+    assert [] == entity._data
+    assert not entity.is_stale
+
+    entity = _playlist_entity()
+    entity.entity_id = "sensor.playlist"
+    entity._restore_payload(payload)
+    assert [{"id": 12, "type": "song"}] == entity._data
+    assert entity.is_stale
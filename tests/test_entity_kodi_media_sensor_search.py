@@ -0,0 +1,56 @@
+"""Tests for entity_kodi_media_sensor_search.py."""
+import asyncio
+import time
+from unittest import mock
+
+from custom_components.kodi_media_sensors.entity_kodi_media_sensor_search import (
+    METHOD_PLAY,
+    KodiMediaSensorsSearchEntity,
+)
+
+CONFIG = {
+    "host": "127.0.0.1",
+    "password": None,
+    "port": 8080,
+    "ssl": False,
+    "username": None,
+}
+
+
+def _search_entity(keep_alive_timer=300):
+    with mock.patch("homeassistant.helpers.event.async_track_state_change_event"):
+        entity = KodiMediaSensorsSearchEntity(
+            "search", mock.Mock(), mock.Mock(), "media_player.kodi", CONFIG, mock.Mock()
+        )
+    entity.hass = mock.Mock()
+    entity.set_search_keep_alive_timer(keep_alive_timer)
+    entity.init_meta("test")
+    entity._clear_result = mock.AsyncMock()
+    entity._force_update_state = mock.Mock()
+    return entity
+
+
+def test_call_reschedules_the_purge():
+    """Test a call other than search resets the keep alive timer, and the purge is scheduled again."""
+    entity = _search_entity()
+    entity.play_song = mock.AsyncMock()
+    with mock.patch("homeassistant.helpers.event.async_call_later") as async_call_later:
+        asyncio.run(entity.async_call_method(METHOD_PLAY, songid=12))
+
+    async_call_later.assert_called_once()
+    assert 299 < async_call_later.call_args[0][1] <= 300
+
+
+def test_purge_after_timer_reset():
+    """Test the search result isn't purged at the deadline of a timer reset since."""
+    entity = _search_entity()
+    entity._search_start_time = time.perf_counter() - 100
+    with mock.patch("homeassistant.helpers.event.async_call_later") as async_call_later:
+        asyncio.run(entity._async_scheduled_update(None))
+
+    entity._clear_result.assert_not_awaited()
+    assert 199 < async_call_later.call_args[0][1] <= 200
+
+    entity._search_start_time = time.perf_counter() - 300
+    asyncio.run(entity._async_scheduled_update(None))
+    entity._clear_result.assert_awaited_once()
@@ -0,0 +1,34 @@
+"""Tests for json_encoder.py."""
+
+import json
+
+import pytest
+
+from custom_components.kodi_media_sensors import json_encoder
+
+
+def test_all_encoders_produce_same_json():
+    """Test the payload decoded is the same whatever the encoder used."""
+    payload = [{"id": 1, "title": "Bohémienne", "rating": "\N{BLACK STAR} 7.5"}]
+    for encoder in json_encoder.ENCODERS.values():
+        assert payload == json.loads(encoder(payload))
+
+
+def test_get_encoder_unknown():
+    """Test an error is raised when the encoder is not available."""
+    with pytest.raises(ValueError):
+        json_encoder.get_encoder("unknown")
+
+
+def test_set_encoder_stdlib():
+    """Test the encoder used by json_dumps can be changed."""
+    json_encoder.set_encoder(json_encoder.ENCODER_STDLIB)
+    try:
+        assert '[{"id": 1}]' == json_encoder.json_dumps([{"id": 1}])
+    finally:
+        json_encoder.set_encoder()
+
+
+def test_json_dumps_falls_back_to_stdlib():
+    """Test values the fast encoders can't handle are serialized anyway."""
+    assert [2**70] == json.loads(json_encoder.json_dumps([2**70]))
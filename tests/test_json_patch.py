@@ -0,0 +1,41 @@
+"""Tests for json_patch.py."""
+from custom_components.kodi_media_sensors.columnar import encode_columnar
+from custom_components.kodi_media_sensors.json_patch import apply_patch, make_patch
+
+
+def test_remove_one_item():
+    """Test removing an item of a long list produces a single operation."""
+    previous = [{"id": idx, "title": f"song {idx}"} for idx in range(2000)]
+    current = previous[:1000] + previous[1001:]
+    patch = make_patch(previous, current)
+    assert [{"op": "remove", "path": "/1000"}] == patch
+    assert current == apply_patch(previous, patch)
+
+
+def test_changed_keys():
+    """Test only the changed keys of a row are published."""
+    previous = [{"id": 1, "title": "a/b", "rating": 5}]
+    current = [{"id": 1, "title": "c", "year": 2000}]
+    patch = make_patch(previous, current)
+    assert {"op": "replace", "path": "/0/title", "value": "c"} in patch
+    assert {"op": "remove", "path": "/0/rating"} in patch
+    assert current == apply_patch(previous, patch)
+
+
+def test_insert_and_remove():
+    """Test the patch applies whatever the changes in the middle of the list."""
+    previous = [1, 2, 3, 4, 5, 6]
+    current = [1, 7, 8, 9, 3, 6]
+    assert current == apply_patch(previous, make_patch(previous, current))
+
+
+def test_columnar_data():
+    """Test the patch applies to the columnar data as published."""
+    previous = [{"id": idx, "title": f"song {idx}"} for idx in range(20)]
+    current = previous[:5] + previous[6:]
+    patch = make_patch(encode_columnar(previous), encode_columnar(current))
+    assert [{"op": "remove", "path": "/rows/5"}] == patch
+
+    current.append({"id": 20})
+    patch = make_patch(encode_columnar(previous), encode_columnar(current))
+    assert encode_columnar(current) == apply_patch(encode_columnar(previous), patch)
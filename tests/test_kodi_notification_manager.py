@@ -0,0 +1,42 @@
+"""Tests for kodi_notification_manager.py."""
+import asyncio
+from unittest.mock import Mock
+
+from custom_components.kodi_media_sensors.kodi_notification_manager import (
+    KodiNotificationManager,
+)
+
+
+def _connection(handlers):
+    connection = Mock()
+    connection.can_subscribe = True
+    connection.server._server_request_handlers = handlers
+    return connection
+
+
+def test_handler_wraps_and_restores_the_kodi_handler():
+    """Test the handler of the kodi integration is still called, and put back at unload."""
+    kodi_handler = Mock(spec=[])
+    handlers = {"Player.OnPlay": kodi_handler}
+    manager = KodiNotificationManager(_connection(handlers))
+    notification_callback = Mock()
+    manager.async_subscribe("Player.OnPlay", notification_callback)
+
+    asyncio.run(handlers["Player.OnPlay"]("xbmc", {"item": {"id": 1}}))
+    kodi_handler.assert_called_once_with("xbmc", {"item": {"id": 1}})
+    notification_callback.assert_called_once_with("xbmc", {"item": {"id": 1}})
+
+    manager.async_restore_handlers()
+    assert kodi_handler is handlers["Player.OnPlay"]
+
+
+def test_handlers_not_found():
+    """Test the sensors keep polling when the handlers of the connection can't be found."""
+    connection = Mock(spec=["can_subscribe", "server"])
+    connection.can_subscribe = True
+    connection.server = object()
+    manager = KodiNotificationManager(connection)
+    assert not manager.can_subscribe
+    manager.async_subscribe("Player.OnPlay", Mock())
+    assert not manager.async_ensure_handlers()
+    manager.async_restore_handlers()
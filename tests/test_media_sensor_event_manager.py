@@ -0,0 +1,31 @@
+"""Tests for media_sensor_event_manager.py."""
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from custom_components.kodi_media_sensors.media_sensor_event_manager import (
+    MediaSensorEventManager,
+)
+
+
+def test_notify_event():
+    """Test the event is sent to the other registered sensors only."""
+    event_manager = MediaSensorEventManager()
+    source, playlist, removed = Mock(), Mock(), Mock()
+    playlist.handle_media_sensor_event = AsyncMock()
+    removed.handle_media_sensor_event = AsyncMock()
+    for sensor in (source, playlist, removed):
+        event_manager.register_sensor(sensor)
+    event_manager.unregister_sensor(removed)
+
+    asyncio.run(event_manager.notify_event(source, "item_added"))
+
+    playlist.handle_media_sensor_event.assert_awaited_once_with("item_added")
+    removed.handle_media_sensor_event.assert_not_awaited()
+    source.handle_media_sensor_event.assert_not_called()
+
+
+def test_sensors_weakly_referenced():
+    """Test a sensor never unregistered is released with the entity."""
+    event_manager = MediaSensorEventManager()
+    event_manager.register_sensor(Mock())
+    assert 0 == len(event_manager._sensors)
@@ -0,0 +1,32 @@
+"""Tests for models.py."""
+import json
+
+from custom_components.kodi_media_sensors.models import GenericItem, Song, create_item
+
+
+def test_item_behaves_like_a_dict():
+    """Test the items keep the dict interface used by the entities."""
+    item = create_item({"type": "song", "title": "a", "art": {"fanart": "x"}})
+    assert isinstance(item, Song)
+    assert "a" == item["title"]
+    assert "art" in item and "album" not in item
+    assert {"fanart": "x"} == item.pop("art")
+    assert "art" not in item
+    item["album"] = "b"
+    assert {"type": "song", "title": "a", "album": "b"} == item
+    assert None is item.get("artist")
+
+
+def test_item_serialized_as_dict():
+    """Test the items are serialized as the dict they replace."""
+    item = create_item({"id": 1, "custom": True}, "unknown")
+    assert isinstance(item, GenericItem)
+    assert '{"id": 1, "custom": true}' == json.dumps(item.as_dict())
+
+
+def test_pending_format_not_published():
+    """Test the type waiting for the formatting of the item is not part of its data."""
+    item = create_item({"type": "song", "title": "a"})
+    item.pending_format = "song"
+    assert {"type": "song", "title": "a"} == item.as_dict()
+    assert "pending_format" not in item
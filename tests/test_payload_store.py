@@ -0,0 +1,28 @@
+"""Tests for payload_store.py."""
+from custom_components.kodi_media_sensors.payload_store import (
+    PayloadStore,
+    data_attributes,
+)
+
+
+def test_publish_same_payload_keeps_version():
+    """Test the version only changes when the content of the payload changes."""
+    store = PayloadStore()
+    first = store.publish("sensor.kodi", '[{"id": 1}]')
+    again = store.publish("sensor.kodi", '[{"id": 1}]')
+    changed = store.publish("sensor.kodi", '[{"id": 2}]')
+    assert 1 == first.version == again.version
+    assert first.etag == again.etag
+    assert 2 == changed.version
+    assert first.etag != changed.etag
+
+
+def test_data_attributes():
+    """Test the data is replaced by its hash, version and url when a store is used."""
+    assert {"data": "[]"} == data_attributes(None, "sensor.kodi", "[]")
+    store = PayloadStore()
+    attrs = data_attributes(store, "sensor.kodi", "[]")
+    assert "data" not in attrs
+    assert 1 == attrs["data_version"]
+    assert "/api/kodi_media_sensors/payload/sensor.kodi" == attrs["data_url"]
+    assert b"[]" == store.get("sensor.kodi").body